@@ -1,11 +1,19 @@
 from temporalio import activity
 from temporalio.exceptions import ApplicationError
-from typing import Dict, Any
+from typing import Dict, Any, List, Awaitable
+from collections import defaultdict
+from datetime import timedelta
+import asyncio
 import os
-from utilities import model
+import random
+from utilities import model, json_codec
+from utilities.cache import AsyncTTLCache
+from utilities.circuit_breaker import CircuitBreaker, CircuitOpenError
+from cachetools import TTLCache
+import xxhash
 from strands import Agent
 from strands.models.ollama import OllamaModel
-from classes.agents import DataFetchAgent, CreditReportAgent
+from classes.agents import DataFetchAgent, CreditReportAgent, InvalidApplicantError, RateLimitedError
 
 
 # ============================================================================
@@ -20,6 +28,147 @@ from classes.agents import DataFetchAgent, CreditReportAgent
 # ============================================================================
 
 
+# Full-jitter backoff for provider-facing activities: each failed attempt asks
+# Temporal to schedule the next one after a random delay in
+# [0, min(cap, base * 2^attempt)], so workflows that failed together against
+# the same upstream do not all retry in lockstep.
+_RETRY_BASE_SECONDS = 0.1
+_RETRY_CAP_SECONDS = 10.0
+
+# Worker-local generator for retry jitter, rather than the shared module-level one
+_rng = random.Random()
+
+
+def _jittered_retry_delay() -> timedelta:
+    """Return the full-jitter delay before the next attempt of the current activity."""
+    attempt = activity.info().attempt
+    ceiling = min(_RETRY_CAP_SECONDS, _RETRY_BASE_SECONDS * 2 ** attempt)
+    return timedelta(seconds=_rng.uniform(0, ceiling))
+
+
+def _retry_delay_for(error: BaseException) -> timedelta:
+    """Wait as long as a rate-limiting provider asked (Retry-After), else use full jitter."""
+    if isinstance(error, RateLimitedError) and error.retry_after is not None:
+        return timedelta(seconds=error.retry_after)
+    return _jittered_retry_delay()
+
+
+# Equal-jitter backoff for the shared LLM server: the delay before the next
+# attempt is drawn from [delay/2, delay] with delay = min(cap, base * 2^attempt),
+# so retries stay spread out but never come sooner than the workflow policy's
+# 1s initial_interval, and an outage of a few seconds doesn't exhaust attempts
+_LLM_RETRY_BASE_SECONDS = 1.0
+_LLM_RETRY_CAP_SECONDS = 10.0
+
+
+def _llm_retry_delay() -> timedelta:
+    """Return the equal-jitter delay before the next LLM attempt of the current activity."""
+    attempt = activity.info().attempt
+    delay = min(_LLM_RETRY_CAP_SECONDS, _LLM_RETRY_BASE_SECONDS * 2 ** attempt)
+    return timedelta(seconds=max(_LLM_RETRY_BASE_SECONDS, _rng.uniform(delay / 2, delay)))
+
+
+def _raise_if_permanent(error: BaseException, message: str) -> None:
+    """Fail the activity without retries when the provider rejected the request itself."""
+    if isinstance(error, InvalidApplicantError):
+        raise ApplicationError(
+            f"{message}: {str(error)}",
+            type="InvalidApplicantError",
+            non_retryable=True
+        )
+
+
+# ============================================================================
+# SOURCE CACHES
+# ============================================================================
+# Repeat fetches for the same applicant (re-submissions, Temporal retries of
+# fetch_all_sources after a partial failure) are served from memory. When a
+# refresh fails, the last good payload is returned instead (stale-if-error).
+# Credit bureaus rate-limit aggressively, so credit reports are kept longer.
+# ============================================================================
+
+_SOURCE_CACHE = AsyncTTLCache(maxsize=1024, ttl=300, stale_ttl=3600)
+_CREDIT_CACHE = AsyncTTLCache(maxsize=1024, ttl=1800, stale_ttl=6 * 3600)
+
+# Last successful credit report per applicant from either bureau. Served when
+# CIBIL and Experian both fail, flagged with data_quality="stale_fallback".
+_LAST_GOOD_CREDIT = TTLCache(maxsize=1024, ttl=24 * 3600)
+
+
+def invalidate_applicant_cache(applicant_id: str) -> None:
+    """Drop all cached source data for an applicant (e.g. after the data changed upstream)."""
+    _SOURCE_CACHE.invalidate(("bank", applicant_id))
+    _SOURCE_CACHE.invalidate(("documents", applicant_id))
+    for provider in ("CIBIL", "Experian"):
+        _CREDIT_CACHE.invalidate((provider, applicant_id))
+
+
+async def _fetch_bank_account(applicant_id: str) -> Dict[str, Any]:
+    """Fetch bank account data, served from the source cache when fresh."""
+    return await _SOURCE_CACHE.get_or_fetch(
+        ("bank", applicant_id), _load_bank_account, applicant_id
+    )
+
+
+async def _fetch_documents(applicant_id: str) -> Dict[str, Any]:
+    """Fetch document metadata, served from the source cache when fresh."""
+    return await _SOURCE_CACHE.get_or_fetch(
+        ("documents", applicant_id), _load_documents, applicant_id
+    )
+
+
+async def _fetch_credit_report(applicant_id: str, provider: str) -> Dict[str, Any]:
+    """Fetch a credit report, served from the credit cache when fresh."""
+    credit_data = await _CREDIT_CACHE.get_or_fetch(
+        (provider, applicant_id), _load_credit_report, applicant_id, provider
+    )
+    _LAST_GOOD_CREDIT[applicant_id] = credit_data
+    activity.logger.debug("Credit cache stats: %s", _CREDIT_CACHE.stats())
+    return credit_data
+
+
+async def _load_bank_account(applicant_id: str) -> Dict[str, Any]:
+    """Fetch and validate bank account data for one applicant."""
+    data_agent = DataFetchAgent()
+
+    # GET the bank API over the pooled HTTP session
+    url = f"http://localhost:3233/bank?applicant_id={applicant_id}"
+    bank_data = await data_agent.fetch_data(url, "bank account")
+
+    # Validate essential fields
+    if "accounts" not in bank_data:
+        raise ValueError("Bank API response missing 'accounts' field")
+
+    return bank_data
+
+
+async def _load_documents(applicant_id: str) -> Dict[str, Any]:
+    """Fetch and validate document metadata for one applicant."""
+    data_agent = DataFetchAgent()
+
+    # GET document metadata over the pooled HTTP session
+    url = f"http://localhost:3233/documents?applicant_id={applicant_id}"
+    documents_data = await data_agent.fetch_data(url, "documents")
+
+    # Validate response structure
+    if "documents" not in documents_data:
+        raise ValueError("Documents API response missing 'documents' field")
+
+    doc_count = len(documents_data.get("documents", []))
+    activity.logger.info("Successfully retrieved %d documents", doc_count)
+
+    return documents_data
+
+
+async def _load_credit_report(applicant_id: str, provider: str) -> Dict[str, Any]:
+    """Fetch and validate a credit report from the given bureau."""
+    # Initialize credit report agent (same validation logic for every bureau)
+    credit_agent = CreditReportAgent()
+
+    url = f"http://localhost:3233/{provider.lower()}?applicant_id={applicant_id}"
+    return await credit_agent.fetch_and_validate_credit_report(applicant_id, provider, url)
+
+
 @activity.defn
 async def fetch_bank_account(applicant_id: str) -> Dict[str, Any]:
     """
@@ -34,26 +183,17 @@ async def fetch_bank_account(applicant_id: str) -> Dict[str, Any]:
     - Strands agent handles the intelligent data fetching logic
     """
     try:
-        # Initialize Strands agent for this activity execution
-        data_agent = DataFetchAgent()
-
-        # Agent fetches data from bank API
-        url = f"http://localhost:3233/bank?applicant_id={applicant_id}"
-        bank_data = data_agent.fetch_data(url, "bank account")
-
-        # Validate essential fields
-        if "accounts" not in bank_data:
-            raise ValueError("Bank API response missing 'accounts' field")
-
-        return bank_data
+        return await _fetch_bank_account(applicant_id)
 
     except Exception as e:
+        _raise_if_permanent(e, "Failed to fetch bank account data")
         # Raise ApplicationError to trigger Temporal's retry mechanism
         # Temporal will retry this activity based on the workflow's retry policy
         raise ApplicationError(
             f"Failed to fetch bank account data: {str(e)}",
             type="BankAPIError",
-            non_retryable=False  # Allow Temporal to retry
+            non_retryable=False,  # Allow Temporal to retry
+            next_retry_delay=_retry_delay_for(e)
         )
 
 
@@ -70,27 +210,15 @@ async def fetch_documents(applicant_id: str) -> Dict[str, Any]:
     The agent could validate document types, check file sizes, verify formats, etc.
     """
     try:
-        # Initialize Strands agent for document fetching
-        data_agent = DataFetchAgent()
-
-        # Agent fetches document metadata from API
-        url = f"http://localhost:3233/documents?applicant_id={applicant_id}"
-        documents_data = data_agent.fetch_data(url, "documents")
-
-        # Validate response structure
-        if "documents" not in documents_data:
-            raise ValueError("Documents API response missing 'documents' field")
-
-        doc_count = len(documents_data.get("documents", []))
-        activity.logger.info(f"Successfully retrieved {doc_count} documents")
-
-        return documents_data
+        return await _fetch_documents(applicant_id)
 
     except Exception as e:
+        _raise_if_permanent(e, "Failed to fetch documents")
         raise ApplicationError(
             f"Failed to fetch documents: {str(e)}",
             type="DocumentAPIError",
-            non_retryable=False
+            non_retryable=False,
+            next_retry_delay=_retry_delay_for(e)
         )
 
 
@@ -110,24 +238,16 @@ async def fetch_credit_report_cibil(applicant_id: str) -> Dict[str, Any]:
     - Strands: Data-level validation and quality checking
     """
     try:
-
-        # Initialize credit report agent
-        credit_agent = CreditReportAgent()
-
-        # Fetch and validate from CIBIL
-        url = f"http://localhost:3233/cibil?applicant_id={applicant_id}"
-        credit_data = credit_agent.fetch_and_validate_credit_report(
-            applicant_id, "CIBIL", url
-        )
-
-        return credit_data
+        return await _fetch_credit_report(applicant_id, "CIBIL")
 
     except Exception as e:
+        _raise_if_permanent(e, "Failed to fetch CIBIL credit report")
         # Temporal will try Experian as fallback (see workflow)
         raise ApplicationError(
             f"Failed to fetch CIBIL credit report: {str(e)}",
             type="CibilAPIError",
-            non_retryable=False
+            non_retryable=False,
+            next_retry_delay=_retry_delay_for(e)
         )
 
 
@@ -140,88 +260,344 @@ async def fetch_credit_report_experian(applicant_id: str) -> Dict[str, Any]:
     - This activity is called by Temporal when CIBIL fails
     - Demonstrates Temporal's orchestration of fallback strategies
     - The agent validates data the same way, ensuring consistency
+    - If Experian fails too, the last good report for the applicant (from
+      either bureau, up to 24h old) is returned as "stale_fallback"
     """
     try:
-
-        # Initialize credit report agent (same validation logic)
-        credit_agent = CreditReportAgent()
-
-        # Fetch and validate from Experian
-        url = f"http://localhost:3233/experian?applicant_id={applicant_id}"
-        credit_data = credit_agent.fetch_and_validate_credit_report(
-            applicant_id, "Experian", url
-        )
-
-        return credit_data
+        return await _fetch_credit_report(applicant_id, "Experian")
 
     except Exception as e:
-        # Both providers failed - workflow will handle final failure
+        # Both providers failed - fall back to the last good report if recent enough
+        last_good = _LAST_GOOD_CREDIT.get(applicant_id)
+        if last_good is not None:
+            activity.logger.warning(
+                "Experian failed, serving last good %s report: %s", last_good.get("provider"), e
+            )
+            return {**last_good, "data_quality": "stale_fallback"}
+
+        # No fallback available - workflow will handle final failure
+        _raise_if_permanent(e, "Failed to fetch Experian credit report")
         raise ApplicationError(
             f"Failed to fetch Experian credit report: {str(e)}",
             type="ExperianAPIError",
-            non_retryable=False
+            non_retryable=False,
+            next_retry_delay=_retry_delay_for(e)
         )
 
+
+# Time budget for each source inside fetch_all_sources. A source that is still
+# pending after this is treated as failed, so one slow upstream cannot hold the
+# whole batch until the activity's start_to_close_timeout.
+_SOURCE_TIMEOUT_SECONDS = 10.0
+
+
+async def _within_budget(source: str, fetch) -> Dict[str, Any]:
+    """Await a single source fetch, failing it once the per-source budget is spent."""
+    try:
+        return await asyncio.wait_for(fetch, _SOURCE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"{source} fetch exceeded {_SOURCE_TIMEOUT_SECONDS:.0f}s budget")
+
+
 @activity.defn
-async def income_assessment(payload: Dict[str, Any]) -> Dict[str, Any]:
+async def fetch_all_sources(applicant_id: str) -> Dict[str, Any]:
+    """
+    Fetch bank, document and CIBIL data for one applicant concurrently.
+
+    ARCHITECTURE NOTE - CONCURRENT DATA ACQUISITION:
+    - The three sources share only the applicant_id, so their HTTP calls
+      overlap and the activity takes roughly as long as the slowest source
+    - Bank and document failures raise the same ApplicationError types as the
+      single-source activities, so Temporal retries this activity as before
+    - A CIBIL failure is reported back instead of raised; the workflow then
+      falls back to Experian exactly as it does for fetch_credit_report_cibil
+
+    Returns:
+        {"bank": {...}, "docs": {...}, "credit": {...} | None, "credit_error": str | None}
+    """
+    fetches = {
+        "bank": _fetch_bank_account(applicant_id),
+        "docs": _fetch_documents(applicant_id),
+        "cibil": _fetch_credit_report(applicant_id, "CIBIL"),
+    }
+    # gather preserves order, so results line up with the tags above
+    bank, docs, cibil = await asyncio.gather(
+        *(_within_budget(source, fetch) for source, fetch in fetches.items()),
+        return_exceptions=True,
+    )
+
+    if isinstance(bank, Exception):
+        _raise_if_permanent(bank, "Failed to fetch bank account data")
+        raise ApplicationError(
+            f"Failed to fetch bank account data: {str(bank)}",
+            type="BankAPIError",
+            non_retryable=False,
+            next_retry_delay=_retry_delay_for(bank)
+        )
+    if isinstance(docs, Exception):
+        _raise_if_permanent(docs, "Failed to fetch documents")
+        raise ApplicationError(
+            f"Failed to fetch documents: {str(docs)}",
+            type="DocumentAPIError",
+            non_retryable=False,
+            next_retry_delay=_retry_delay_for(docs)
+        )
+
+    credit_error = None
+    if isinstance(cibil, Exception):
+        # Leave the Experian fallback decision to the workflow
+        credit_error = f"Failed to fetch CIBIL credit report: {str(cibil)}"
+        activity.logger.warning(credit_error)
+        cibil = None
+
+    return {"bank": bank, "docs": docs, "credit": cibil, "credit_error": credit_error}
+
+
+@activity.defn
+async def fetch_all_sources_bulk(applicant_ids: List[str]) -> Dict[str, Any]:
+    """
+    Fetch bank, document and CIBIL data for a batch of applicants concurrently.
+
+    ARCHITECTURE NOTE - BATCHED DATA ACQUISITION:
+    - Used by SupervisorBatchWorkflow: one activity per shard of applicants
+      instead of one per applicant, all sharing the pooled HTTP session
+    - A failure for one applicant does not fail (or retry) the batch; it is
+      reported as {"error": ...} and that applicant's child workflow fetches
+      its own data with the usual per-activity retries
+
+    Returns:
+        {applicant_id: fetch_all_sources result | {"error": str}}
+    """
+    results = await asyncio.gather(
+        *(fetch_all_sources(applicant_id) for applicant_id in applicant_ids),
+        return_exceptions=True,
+    )
+    return {
+        applicant_id: {"error": str(result)} if isinstance(result, Exception) else result
+        for applicant_id, result in zip(applicant_ids, results)
+    }
+
+
+# ============================================================================
+# SPECIALIST ASSESSMENT PHASE
+# ============================================================================
+# The three assessments are cheap heuristics over data that Phase 1 already
+# fetched, so they run inside a single activity: one task-queue round-trip
+# and one history event instead of three.
+# ============================================================================
+
+
+# Heuristic defaults (used when the application omits a field) and thresholds
+_DEFAULT_INCOME = 5000
+_DEFAULT_AMOUNT = 1000
+_DEFAULT_EXPENSES = 1000
+_DEFAULT_SCORE = 600
+_MIN_INCOME_RATIO = 2
+_MIN_BALANCE = 5000
+_MIN_CREDIT_SCORE = 620
+
+
+def _assess_income(income: float, amount: float, bank: Dict[str, Any]) -> Dict[str, Any]:
     # TODO: this needs to use bedrock document automation using bank statement credits
-    # TODO: payload contains application, bank, credit
-    app = payload.get("application", {})
-    bank = payload.get("bank", {})
+    accounts = bank.get("accounts")
     # simple heuristic
-    balance = bank["accounts"][0]["balance"] if bank.get("accounts") else 0
-    ratio = app.get("income", 5000) / max(app.get("amount", 1000), 1)
-    result = {"income_ok": ratio > 2 or balance > 5000, "income": app.get("income")}
+    balance = accounts[0]["balance"] if accounts else 0
+    ratio = income / max(amount, 1)
+    result = {"income_ok": ratio > _MIN_INCOME_RATIO or balance > _MIN_BALANCE, "income": income}
     return result
 
 
-@activity.defn
-async def expense_assessment(payload: Dict[str, Any]) -> Dict[str, Any]:
+def _assess_expense(income: float, amount: float, expenses: float) -> Dict[str, Any]:
     # TODO: this needs to use bedrock document automation using bank statement debits
+    disposable = income - expenses
+    result = {"affordability_ok": disposable > amount / 12, "expenses": expenses}
+    return result
+
 
-    app = payload.get("application", {})
-    bank = payload.get("bank", {})
-    expenses = app.get("expenses", 1000)
-    disposable = app.get("income", 5000) - expenses
-    result = {"affordability_ok": disposable > app.get("amount", 1000) / 12, "expenses": expenses}
+def _assess_credit(credit: Dict[str, Any]) -> Dict[str, Any]:
+    score = credit.get("score", _DEFAULT_SCORE)
+    result = {"credit_ok": score > _MIN_CREDIT_SCORE, "score": score}
     return result
 
 
+def _run_specialist(name: str, assess, *args: Any) -> Dict[str, Any]:
+    """Run one assessment; a failure is reported in its result instead of failing (and retrying) all three."""
+    try:
+        return assess(*args)
+    except Exception as e:
+        activity.logger.warning("%s assessment failed: %s", name, e)
+        return {"error": str(e)}
+
+
+@activity.defn
+async def compute_assessments(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the income, expense and credit assessments in one activity.
+
+    Args:
+        payload: {"application": {...}, "bank": {...}, "credit": {...}}
+
+    Returns:
+        {"income": {...}, "expense": {...}, "credit": {...}}
+    """
+    # Resolve the shared application fields once for all three assessments
+    app = payload.get("application") or {}
+    income = app.get("income", _DEFAULT_INCOME)
+    amount = app.get("amount", _DEFAULT_AMOUNT)
+
+    return {
+        "income": _run_specialist("income", _assess_income, income, amount, payload.get("bank") or {}),
+        "expense": _run_specialist("expense", _assess_expense, income, amount, app.get("expenses", _DEFAULT_EXPENSES)),
+        "credit": _run_specialist("credit", _assess_credit, payload.get("credit") or {}),
+    }
+
+
+# Per-assessment activities scheduled by SupervisorWorkflow runs started before
+# the concurrent pipeline (see _run_legacy in workflows.py). Keep them
+# registered until those runs have all closed.
+
+@activity.defn
+async def income_assessment(payload: Dict[str, Any]) -> Dict[str, Any]:
+    app = payload.get("application") or {}
+    return _assess_income(
+        app.get("income", _DEFAULT_INCOME), app.get("amount", _DEFAULT_AMOUNT), payload.get("bank") or {}
+    )
+
+
+@activity.defn
+async def expense_assessment(payload: Dict[str, Any]) -> Dict[str, Any]:
+    app = payload.get("application") or {}
+    return _assess_expense(
+        app.get("income", _DEFAULT_INCOME), app.get("amount", _DEFAULT_AMOUNT), app.get("expenses", _DEFAULT_EXPENSES)
+    )
+
+
 @activity.defn
 async def credit_assessment(payload: Dict[str, Any]) -> Dict[str, Any]:
-    credit = payload.get("credit", {})
-    score = credit.get("score", 600)
-    result = {"credit_ok": score > 620, "score": score}
-    return result
+    return _assess_credit(payload.get("credit") or {})
 
 
 @activity.defn
-async def aggregate_and_decide(payload: Dict[str, Any]) -> Dict[str, Any]:
+async def fetch_and_assess(application: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fetch all Phase 1 sources and, when CIBIL succeeds, run the Phase 2
+    assessments in the same activity.
+
+    ARCHITECTURE NOTE - FUSED ACQUISITION + ASSESSMENT:
+    - The assessments only consume Phase 1 data, so in the common case there
+      is no reason to hop back through the task queue for compute_assessments
+    - When CIBIL fails, "assessments" is None; the workflow falls back to
+      Experian and runs compute_assessments on the Experian report itself
+
+    Returns:
+        fetch_all_sources' result plus "assessments": {...} | None
+    """
+    sources = await fetch_all_sources(application["applicant_id"])
+
+    assessments = None
+    if sources["credit"] is not None:
+        assessments = await compute_assessments(
+            {"application": application, "bank": sources["bank"], "credit": sources["credit"]}
+        )
+
+    return {**sources, "assessments": assessments}
+
+
+# Identical decision prompts (Temporal retries, re-submitted applications)
+# reuse the previous LLM explanation instead of re-running inference.
+_LLM_CACHE = AsyncTTLCache(maxsize=512, ttl=3600)
+
+# One breaker per (provider, model_id, host). After 5 consecutive LLM failures
+# the decision skips inference for 30s and routes straight to manual review,
+# instead of every workflow waiting out the connect timeout.
+_LLM_BREAKERS: Dict[tuple, CircuitBreaker] = defaultdict(
+    lambda: CircuitBreaker(failure_threshold=5, reset_timeout=30.0)
+)
+
+
+# Fixed instructions live in the system prompt so every request starts with the
+# same token prefix; Ollama/llama.cpp reuse the KV cache for that shared prefix
+# instead of re-running prefill over it.
+_DECISION_SYSTEM_PROMPT = (
+    "You are a smart loan underwriting analyst. You have to understand all data, "
+    "reason step by step and provide decision."
+)
+
+
+async def _explain_decision(text: str) -> str:
+    """Run the decision prompt through a Strands agent and return its explanation."""
+    agent = Agent(model=model.get_model(), system_prompt=_DECISION_SYSTEM_PROMPT)
+    agent_response = await agent.invoke_async(text)
+    return str(agent_response) if agent_response is not None else "No response from agent"
+
+
+# aggregate_and_decide is scheduled with a 30s heartbeat_timeout, so a worker
+# that dies mid-inference is detected in seconds rather than at the 20min
+# start_to_close_timeout. Beat well inside that window while waiting on the LLM.
+_HEARTBEAT_INTERVAL_SECONDS = 10.0
+
+
+async def _with_heartbeat(awaitable: Awaitable[Any], stage: str) -> Any:
+    """Await awaitable, heartbeating {"stage": stage, "beats": n} until it completes."""
+    task = asyncio.ensure_future(awaitable)
     try:
-        agent = Agent(model=model.get_model())
+        beats = 0
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=_HEARTBEAT_INTERVAL_SECONDS)
+            if done:
+                return task.result()
+            beats += 1
+            activity.heartbeat({"stage": stage, "beats": beats})
+    finally:
+        # No-op once finished; stops our wait on the LLM if the activity is cancelled
+        task.cancel()
+
 
+@activity.defn
+async def aggregate_and_decide(payload: Dict[str, Any]) -> Dict[str, Any]:
+    credit = payload.get("credit") or {}
+    score = credit.get("score", _DEFAULT_SCORE)
+
+    try:
         prompt_data = {
             "application": payload.get("application"),
             "assessments": payload.get("income"),
             "expense": payload.get("expense"),
-            "credit": payload.get("credit"),
+            "credit": credit,
         }
-        text = f"You are a smart loan underwriting analyst. You have to understand all data, reason step by step and provide decision. Summarize and give a suggested decision for this loan: {prompt_data}"
-        agent_response = agent(text)
-        explanation = str(agent_response) if agent_response is not None else "No response from agent"
+        # Serialize once: the same canonical JSON feeds the prompt and the cache key
+        prompt_json = json_codec.dumps_sorted(prompt_data)
+        text = f"Summarize and give a suggested decision for this loan: {prompt_json.decode()}"
+        # Non-cryptographic hash: the key only needs to be unique within the cache
+        cache_key = xxhash.xxh3_64_intdigest(prompt_json)
+        breaker = _LLM_BREAKERS[model.model_key()]
+        activity.heartbeat({"stage": "prompt_built"})
+        explanation = await _with_heartbeat(
+            _LLM_CACHE.get_or_fetch(cache_key, breaker.call, _explain_decision, text),
+            "llm_inference",
+        )
+        activity.logger.debug("LLM decision cache stats: %s", _LLM_CACHE.stats())
         llm_error = False
 
+    except CircuitOpenError as e:
+        activity.logger.warning("Skipping LLM decision, %s", e)
+        explanation = "LLM unavailable; application routed to manual review."
+        llm_error = True
+
     except Exception as e:
+        # Every workflow shares one LLM server, so retries are jittered
+        # (equal jitter, never shorter than the policy's initial interval)
         raise ApplicationError(
             f"Ollama LLM call failed: {str(e)}",
             type="OllamaLLMError",
-            non_retryable=False
+            non_retryable=False,
+            next_retry_delay=_llm_retry_delay()
         )
 
     recommendation = (
         "manual_review"
         if llm_error
-        else ("approve" if payload.get("credit", {}).get("score", 600) > 650 else "manual_review")
+        else ("approve" if score > 650 else "manual_review")
     )
 
     # Standardized decision contract returned to the workflow/UI
@@ -1,4 +1,4 @@
-from classes.agents.data_fetch_agent import DataFetchAgent
+from classes.agents.data_fetch_agent import DataFetchAgent, InvalidApplicantError, RateLimitedError
 from classes.agents.credit_report_agent import CreditReportAgent
 
-__all__ = ["DataFetchAgent", "CreditReportAgent"]
+__all__ = ["DataFetchAgent", "CreditReportAgent", "InvalidApplicantError", "RateLimitedError"]
@@ -1,40 +1,48 @@
 from temporalio import activity
-from typing import Dict, Any
-import json
-from strands import Agent
-from strands_tools import http_request
+from typing import Dict, Any, Optional
+from utilities import get_http_session, json_codec
+
+
+class RateLimitedError(ValueError):
+    """
+    Raised when an API answers 429/503. Carries the provider's Retry-After
+    hint (in seconds) when one was sent, so callers can wait exactly that long.
+    """
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class InvalidApplicantError(ValueError):
+    """
+    Raised when an API rejects the request itself (400/401/403/404), e.g. an
+    unknown applicant_id or bad credentials. Retrying cannot succeed.
+    """
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Return a delta-seconds Retry-After header as a float (HTTP-date values are ignored)."""
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
 
 
 class DataFetchAgent:
     """
-    Specialized Strands agent for fetching data from external APIs.
-    Demonstrates the inner loop of agent-based data acquisition within
-    a Temporal activity (outer loop).
+    Fetches JSON data from external APIs for the data acquisition activities
+    (the inner loop inside a Temporal activity, the outer loop).
+
+    Requests go straight through the pooled HTTP session; responses are
+    checked for HTTP errors, rate limiting and malformed JSON.
     """
 
-    def __init__(self):
-        """Initialize the data fetch agent with HTTP request capabilities."""
-        self.agent = Agent(
-            system_prompt="""You are a data acquisition specialist agent for a loan underwriting system.
-
-Your responsibilities:
-1. Make HTTP requests to external APIs
-2. Validate the response data structure
-3. Extract and parse JSON responses
-4. Handle errors gracefully with detailed context
-5. Return clean, structured data
-
-When making requests:
-- Use the http_request tool to fetch data
-- Always validate that responses contain expected fields
-- Parse JSON bodies correctly
-- Report any data quality issues""",
-            tools=[http_request]
-        )
-
-    def fetch_data(self, url: str, data_type: str) -> Dict[str, Any]:
+    async def fetch_data(self, url: str, data_type: str) -> Dict[str, Any]:
         """
-        Fetch data from an API endpoint using the Strands agent.
+        Fetch data from an API endpoint over the pooled HTTP session.
 
         Args:
             url: The API endpoint URL
@@ -43,49 +51,51 @@ When making requests:
         Returns:
             Parsed JSON response data
         """
+        status_code = None
+        body = None
         try:
-            # Agent makes the HTTP request using its tool
-            response = self.agent.tool.http_request(
-                method="GET",
-                url=url
-            )
-
-            # Extract status code and body from response
-            status_code = None
-            body_text = None
-
-            for item in response.get("content", []):
-                if isinstance(item, dict) and "text" in item:
-                    text = item["text"]
-                    # Extract status code
-                    if text.startswith("Status:"):
-                        status_code = text[len("Status:"):].strip()
-                    # Extract body
-                    elif text.startswith("Body:"):
-                        body_text = text[len("Body:"):].strip()
+            # Reuse pooled keep-alive connections instead of a fresh agent tool call
+            session = await get_http_session()
+            async with session.get(url) as response:
+                status_code = response.status
+                body = await response.read()
+                retry_after = response.headers.get("Retry-After")
+
+            # Rate limited / temporarily unavailable: surface the provider's hint
+            if status_code in (429, 503):
+                raise RateLimitedError(
+                    f"HTTP {status_code} from {data_type} API (Retry-After: {retry_after})",
+                    retry_after=_parse_retry_after(retry_after),
+                )
+
+            # Client errors are permanent: the same request will fail the same way
+            if status_code in (400, 401, 403, 404):
+                raise InvalidApplicantError(f"HTTP {status_code} error from {data_type} API")
 
             # Check for HTTP error status codes
-            if status_code and not status_code.startswith("2"):
+            if not 200 <= status_code < 300:
                 error_msg = f"HTTP {status_code} error from {data_type} API"
-                if body_text:
-                    error_msg += f": {body_text}"
+                if body:
+                    error_msg += f": {body.decode(errors='replace')}"
                 raise ValueError(error_msg)
 
-            if not body_text:
+            if not body:
                 raise ValueError(f"No body found in {data_type} API response")
 
             # Parse JSON
-            parsed_data = json.loads(body_text)
+            parsed_data = json_codec.loads(body)
 
-            activity.logger.info(f"Successfully fetched {data_type} data: {parsed_data}")
+            activity.logger.info("Successfully fetched %s data: %s", data_type, parsed_data)
             return parsed_data
 
-        except json.JSONDecodeError as e:
+        except json_codec.JSONDecodeError as e:
             error_msg = f"Invalid JSON in {data_type} API response: {str(e)}"
-            if body_text:
-                error_msg += f". Response body: {body_text[:200]}"
+            if body:
+                error_msg += f". Response body: {body[:200].decode(errors='replace')}"
             if status_code:
                 error_msg += f". HTTP Status: {status_code}"
             raise ValueError(error_msg)
+        except (RateLimitedError, InvalidApplicantError):
+            raise
         except Exception as e:
             raise Exception(f"Failed to fetch {data_type} data: {str(e)}")
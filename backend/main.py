@@ -1,27 +1,63 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, Field
-from strands import Agent
-from strands.models.ollama import OllamaModel
-import os
-from .utilities import model
-from .utilities import get_temporal_client
 from dotenv import load_dotenv
-from typing import Optional
 
+# Load .env before importing modules that read configuration at import time
 load_dotenv()
 
-app = FastAPI()
+import asyncio
+import base64
+import uuid
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, Field
+from temporalio.client import Client, WorkflowExecutionStatus
+from temporalio.common import WorkflowIDReusePolicy
+from temporalio.exceptions import WorkflowAlreadyStartedError
+import os
+from cachetools import TTLCache
+import xxhash
+from .utilities import get_temporal_client, json_codec
+from .utilities.cache import AsyncTTLCache
+from typing import List, Optional
 
 TASK_QUEUE = os.getenv("TEMPORAL_TASK_QUEUE", "loan-underwriter-queue")
 
-try:
-    strands_agent = Agent(model=model.get_model())
-    strands_enabled = True
-    print("Strands Agent initialized successfully")
-except Exception as e:
-    print(f"Warning: Failed to initialize Strands Agent: {e}")
-    strands_agent = None
-    strands_enabled = False
+# Endpoints only enqueue log records; a background thread does the blocking
+# stdio writes so they never stall the event loop
+_log_queue: queue.Queue = queue.Queue(-1)
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_log_listener = QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+
+# Route every application logger (including utilities) through the queue;
+# set LOG_LEVEL=WARNING in production to drop per-request INFO records
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"), handlers=[QueueHandler(_log_queue)])
+
+logger = logging.getLogger("loan")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connect once at startup; every request reuses the same client (and gRPC channel)
+    app.state.temporal_client = await get_temporal_client()
+    try:
+        yield
+    finally:
+        # Flush any queued log records before the process exits
+        _log_listener.stop()
+
+
+# orjson serializes the large nested query/describe payloads much faster than json
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+
+def get_client(request: Request) -> Client:
+    """FastAPI dependency returning the process-wide Temporal client."""
+    return request.app.state.temporal_client
 
 
 class LoanApplication(BaseModel):
@@ -34,88 +70,180 @@ class LoanApplication(BaseModel):
 
 
 @app.post("/submit")
-async def submit_application(app_data: dict):
+async def submit_application(app_data: LoanApplication, client: Client = Depends(get_client)):
+    # FastAPI validates the body against LoanApplication (pydantic-core) before
+    # this runs; invalid input gets a 422 without reaching the handler
     try:
-        # Use Strands Agents for structured validation if available, otherwise use direct Pydantic validation
-        if strands_enabled and strands_agent:
-            try:
-                validated_data = strands_agent.structured_output(
-                    LoanApplication,
-                    f"Validate this loan application data: {app_data}"
-                )
-                print(f"Received application (via Strands): {validated_data}")
-            except Exception as strands_error:
-                print(f"Strands validation failed, falling back to direct validation: {strands_error}")
-                validated_data = LoanApplication(**app_data)
-                print(f"Received application (direct): {validated_data}")
-        else:
-            validated_data = LoanApplication(**app_data)
-            print(f"Received application (direct): {validated_data}")
-
-        client = await get_temporal_client()
-        print("Connected to Temporal")
+        logger.info("Received application: %s", app_data)
 
+        workflow_id = f"loan-{app_data.applicant_id}"
+        try:
+            # A closed application may be re-submitted, but only one run per
+            # applicant can be open at a time
+            handle = await client.start_workflow(
+                "SupervisorWorkflow",
+                app_data.model_dump(),
+                id=workflow_id,
+                task_queue=TASK_QUEUE,
+                id_reuse_policy=WorkflowIDReusePolicy.ALLOW_DUPLICATE,
+            )
+        except WorkflowAlreadyStartedError:
+            # Duplicate submit (client retry, double click): return the run
+            # already in progress instead of starting the pipeline again
+            desc = await client.get_workflow_handle(workflow_id).describe()
+            logger.info("Workflow already running: %s", workflow_id)
+            return {"workflow_id": workflow_id, "run_id": desc.run_id, "duplicate": True}
+
+        logger.info("Workflow started: %s", handle.id)
+        return {"workflow_id": handle.id, "run_id": handle.run_id}
+    except Exception as e:
+        logger.exception("submit failed")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/submit/batch")
+async def submit_batch(applications: List[LoanApplication], client: Client = Depends(get_client)):
+    """
+    Start one SupervisorBatchWorkflow for many applications.
+
+    Phase 1 data is fetched in bulk; every application still gets its own
+    "loan-<applicant_id>" workflow for review, so the other endpoints apply
+    unchanged. Applicants already in progress are skipped by the batch, so the
+    loan workflow ids it actually started are read from GET /batch/{workflow_id}.
+    """
+    try:
+        logger.info("Received batch of %d applications", len(applications))
         handle = await client.start_workflow(
-            "SupervisorWorkflow",
-            validated_data.model_dump(),
-            id=f"loan-{validated_data.applicant_id}",
+            "SupervisorBatchWorkflow",
+            [application.model_dump() for application in applications],
+            id=f"loan-batch-{uuid.uuid4()}",
             task_queue=TASK_QUEUE,
         )
-        print(f"Workflow started: {handle.id}")
+        logger.info("Batch workflow started: %s", handle.id)
         return {"workflow_id": handle.id, "run_id": handle.run_id}
     except Exception as e:
-        print(f"Error: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("batch submit failed")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/status/{workflow_id}")
-async def status(workflow_id: str):
-    client = await get_temporal_client()
+@app.get("/batch/{workflow_id}")
+async def batch_status(workflow_id: str, client: Client = Depends(get_client)):
+    """
+    Return the loan workflow ids a batch has started so far.
+
+    "complete" turns true once the batch has started every loan it will start.
+    """
     try:
         wf = client.get_workflow_handle(workflow_id)
+        desc = await wf.describe()
+        if desc.status in _TERMINAL_STATUSES:
+            wf = client.get_workflow_handle(workflow_id, run_id=desc.run_id)
+        started = await _cached_query(wf, "get_started_workflow_ids", desc)
+        return {
+            "workflow_id": workflow_id,
+            "loan_workflow_ids": started,
+            "complete": desc.status == WorkflowExecutionStatus.COMPLETED,
+        }
+    except Exception as e:
+        logger.error("Error in batch_status: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Attempt to query the workflow for summary and final result (queries are optional)
-        summary = None
-        final = None
-        try:
-            summary = await wf.query("get_summary")
-        except Exception:
-            # query may not be implemented or workflow not at that stage
-            summary = None
 
-        try:
-            final = await wf.query("get_final_result")
-        except Exception:
-            final = None
+# Run states whose query results can no longer change
+_TERMINAL_STATUSES = frozenset({
+    WorkflowExecutionStatus.COMPLETED,
+    WorkflowExecutionStatus.FAILED,
+    WorkflowExecutionStatus.CANCELED,
+    WorkflowExecutionStatus.TERMINATED,
+    WorkflowExecutionStatus.TIMED_OUT,
+})
+
+# Query results for polling endpoints. While a workflow runs, results are
+# reused for 2s, so a burst of UI polls costs one query (and one replay on the
+# worker); concurrent identical queries share a single in-flight call. Closed
+# runs are keyed by run_id and kept for an hour.
+_QUERY_CACHE = AsyncTTLCache(maxsize=1024, ttl=2)
+_CLOSED_QUERY_CACHE = AsyncTTLCache(maxsize=10_000, ttl=3600)
+
 
-        # Also include describe() metadata to help debugging
+def _cached_query(wf, query_name: str, desc=None):
+    """
+    Return a coroutine running query_name on wf through the query caches.
+
+    When desc is terminal, wf must be pinned to desc.run_id.
+    """
+    if desc is not None and desc.status in _TERMINAL_STATUSES:
+        return _CLOSED_QUERY_CACHE.get_or_fetch((wf.id, desc.run_id, query_name), wf.query, query_name)
+    # run_id is None for "latest run" handles, so a resubmission under the same
+    # ID doesn't share entries with handles pinned to an older run
+    return _QUERY_CACHE.get_or_fetch((wf.id, wf.run_id, query_name), wf.query, query_name)
+
+
+@app.get("/status/{workflow_id}")
+async def status(workflow_id: str, client: Client = Depends(get_client)):
+    try:
+        wf = client.get_workflow_handle(workflow_id)
+
+        # describe() first: the final result only exists once the workflow has
+        # completed, so running workflows skip that query (and its replay)
         try:
             desc = await wf.describe()
         except Exception:
             desc = None
 
+        # Closed-run results are cached under desc.run_id, so query that run
+        # rather than whichever run is latest when the query executes
+        if desc is not None and desc.status in _TERMINAL_STATUSES:
+            wf = client.get_workflow_handle(workflow_id, run_id=desc.run_id)
+
+        queries = [_cached_query(wf, "get_summary", desc)]
+        if desc is None or desc.status == WorkflowExecutionStatus.COMPLETED:
+            queries.append(_cached_query(wf, "get_final_result", desc))
+
+        # Queries are optional; any that fail are reported as None
+        results = [
+            None if isinstance(r, Exception) else r
+            for r in await asyncio.gather(*queries, return_exceptions=True)
+        ]
+        summary = results[0]
+        final = results[1] if len(results) > 1 else None
+
         return {"workflow_id": workflow_id, "summary": summary, "final_result": final, "describe": desc}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/workflow/{workflow_id}/summary")
-async def get_summary(workflow_id: str):
-    client = await get_temporal_client()
+async def get_summary(workflow_id: str, request: Request, client: Client = Depends(get_client)):
     try:
         wf = client.get_workflow_handle(workflow_id)
         # call query - make sure query name matches the method name
-        summary = await wf.query("get_summary")
+        summary = await _cached_query(wf, "get_summary")
         # Ensure response is JSON serializable
         result = {
             "workflow_id": workflow_id,
             "summary": summary if summary is not None else {"status": "pending"}
         }
-        return result
+        # Canonical bytes double as the ETag input, so an unchanged summary
+        # is answered with a bodiless 304 to clients that sent If-None-Match
+        body = json_codec.dumps_sorted(result)
+        etag = f'"{xxhash.xxh3_64_hexdigest(body)}"'
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(content=body, media_type="application/json", headers={"ETag": etag})
+    except Exception as e:
+        logger.error("Error in get_summary: %s", e)
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/workflow/{workflow_id}/progress")
+async def get_progress(workflow_id: str, client: Client = Depends(get_client)):
+    try:
+        wf = client.get_workflow_handle(workflow_id)
+        progress = await _cached_query(wf, "get_progress")
+        return {"workflow_id": workflow_id, "progress": progress}
     except Exception as e:
-        print(f"Error in get_summary: {e}")
+        logger.error("Error in get_progress: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -126,39 +254,23 @@ class ReviewRequest(BaseModel):
 
 
 @app.post("/workflow/{workflow_id}/review")
-async def human_review(workflow_id: str, review: dict):
+async def human_review(workflow_id: str, review: ReviewRequest, client: Client = Depends(get_client)):
     try:
-        # Use Strands Agents for structured validation if available, otherwise use direct Pydantic validation
-        if strands_enabled and strands_agent:
-            try:
-                validated_review = strands_agent.structured_output(
-                    ReviewRequest,
-                    f"Validate this review request data: {review}"
-                )
-                print(f"Review validated (via Strands): {validated_review}")
-            except Exception as strands_error:
-                print(f"Strands validation failed, falling back to direct validation: {strands_error}")
-                validated_review = ReviewRequest(**review)
-                print(f"Review validated (direct): {validated_review}")
-        else:
-            validated_review = ReviewRequest(**review)
-            print(f"Review validated (direct): {validated_review}")
-
-        client = await get_temporal_client()
+        logger.info("Review received: %s", review)
+
         wf = client.get_workflow_handle(workflow_id)
         # send signal
-        await wf.signal("human_review", validated_review.model_dump())
+        await wf.signal("human_review", review.model_dump())
         return {"workflow_id": workflow_id, "signaled": True}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/workflow/{workflow_id}/final")
-async def get_final_result(workflow_id: str):
-    client = await get_temporal_client()
+async def get_final_result(workflow_id: str, client: Client = Depends(get_client)):
     try:
         wf = client.get_workflow_handle(workflow_id)
-        final = await wf.query("get_final_result")
+        final = await _cached_query(wf, "get_final_result")
         # Ensure response is JSON serializable
         result = {
             "workflow_id": workflow_id,
@@ -166,60 +278,145 @@ async def get_final_result(workflow_id: str):
         }
         return result
     except Exception as e:
-        print(f"Error in get_final_result: {e}")
+        logger.error("Error in get_final_result: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Visibility query for the loan workflows listed by /workflows
+_WORKFLOW_LIST_QUERY = "WorkflowType='SupervisorWorkflow'"
+
+# Upper bound on concurrent Temporal queries issued by /workflows
+_QUERY_CONCURRENCY = 32
+
+# A closed run's summary and final result can never change, so its row is
+# built once and served from memory on later /workflows calls
+_terminal_rows = TTLCache(maxsize=10_000, ttl=3600)
+
+
+async def _query_workflow(client: Client, workflow_id: str, run_id: str, limit: asyncio.Semaphore) -> list:
+    """Run both workflow queries concurrently; failed queries come back as exceptions."""
+    async with limit:
+        # Pin the listed run: with ALLOW_DUPLICATE an older run of the same ID
+        # would otherwise be answered by the latest run
+        wf = client.get_workflow_handle(workflow_id, run_id=run_id)
+        # Shares in-flight calls (and recent results) with the polling endpoints
+        return await asyncio.gather(
+            _cached_query(wf, "get_summary"), _cached_query(wf, "get_final_result"),
+            return_exceptions=True,
+        )
+
+
+def _workflow_row(workflow, summary: Optional[dict], final_result: Optional[dict]) -> dict:
+    """Build the /workflows table row for one workflow from its query results."""
+    if summary:
+        application = summary.get("application", {})
+        suggested = summary.get("suggested_decision", {})
+        applicant_name = application.get("name")
+        applicant_id = application.get("applicant_id")
+        loan_amount = application.get("amount")
+        ai_recommendation = suggested.get("decision")
+        ai_summary = suggested.get("reasoning")
+        if "suggested_decision" not in summary:
+            # Partial summary: sources/assessments are in, the decision is not
+            ai_recommendation = "Pending"
+            ai_summary = "Processing..."
+    else:
+        applicant_name = applicant_id = "Unknown"
+        loan_amount = 0
+        ai_recommendation = "Pending"
+        ai_summary = "Processing..."
+
+    return {
+        "workflow_id": workflow.id,
+        "run_id": workflow.run_id,
+        "status": workflow.status.name,
+        # Left as datetimes; /workflows returns an ORJSONResponse directly, so
+        # orjson writes them as ISO 8601
+        "start_time": workflow.start_time,
+        "close_time": workflow.close_time,
+        "applicant_name": applicant_name,
+        "applicant_id": applicant_id,
+        "loan_amount": loan_amount,
+        "ai_recommendation": ai_recommendation,
+        "ai_summary": ai_summary,
+        "human_decision": final_result.get("human_decision", {}).get("action") if final_result else None,
+        "summary": summary,
+        "final_result": final_result
+    }
+
+
 @app.get("/workflows")
-async def list_workflows():
-    """List all loan workflows with their status, summary, and metadata."""
-    client = await get_temporal_client()
+async def list_workflows(
+    limit: int = Query(50, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    client: Client = Depends(get_client),
+):
+    """
+    List loan workflows with their status, summary, and metadata, one page at a time.
+
+    Pass the returned next_cursor back as ?cursor= to fetch the next page;
+    it is None on the last page.
+    """
+    # Decode outside the try below so a bad cursor is a 400, not a 500
     try:
-        workflows_list = []
-
-        # List workflows - filter by loan workflows using the ID pattern
-        async for workflow in client.list_workflows("WorkflowType='SupervisorWorkflow'"):
-            try:
-                # Get workflow handle and query for summary
-                wf = client.get_workflow_handle(workflow.id)
-                summary = None
-                final_result = None
+        page_token = base64.urlsafe_b64decode(cursor) if cursor else None
+    except ValueError:  # includes binascii.Error
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
-                try:
-                    summary = await wf.query("get_summary")
-                except Exception:
-                    summary = None
+    try:
+        workflows_list = []
 
+        # Fetch a single visibility page instead of streaming every workflow ever started
+        listing = client.list_workflows(
+            _WORKFLOW_LIST_QUERY,
+            page_size=limit,
+            next_page_token=page_token,
+        )
+        await listing.fetch_next_page()
+        workflows = listing.current_page or []
+        next_token = listing.next_page_token
+
+        # Query every uncached workflow concurrently (bounded) instead of 2N
+        # sequential round-trips
+        cached_rows = {}
+        pending = []
+        for workflow in workflows:
+            row = _terminal_rows.get((workflow.id, workflow.run_id))
+            if row is None:
+                pending.append(workflow)
+            else:
+                cached_rows[(workflow.id, workflow.run_id)] = row
+
+        query_limit = asyncio.Semaphore(_QUERY_CONCURRENCY)
+        query_results = dict(zip(
+            ((w.id, w.run_id) for w in pending),
+            await asyncio.gather(*(_query_workflow(client, w.id, w.run_id, query_limit) for w in pending)),
+        ))
+
+        for workflow in workflows:
+            key = (workflow.id, workflow.run_id)
+            row = cached_rows.get(key)
+            if row is None:
+                results = query_results[key]
+                summary, final_result = (None if isinstance(r, Exception) else r for r in results)
                 try:
-                    final_result = await wf.query("get_final_result")
-                except Exception:
-                    final_result = None
-
-                # Extract key information for the table
-                workflow_info = {
-                    "workflow_id": workflow.id,
-                    "run_id": workflow.run_id,
-                    "status": workflow.status.name,
-                    "start_time": workflow.start_time.isoformat() if workflow.start_time else None,
-                    "close_time": workflow.close_time.isoformat() if workflow.close_time else None,
-                    "applicant_name": summary.get("application", {}).get("name") if summary else "Unknown",
-                    "applicant_id": summary.get("application", {}).get("applicant_id") if summary else "Unknown",
-                    "loan_amount": summary.get("application", {}).get("amount") if summary else 0,
-                    "ai_recommendation": summary.get("suggested_decision", {}).get("decision") if summary else "Pending",
-                    "ai_summary": summary.get("suggested_decision", {}).get("reasoning") if summary else "Processing...",
-                    "human_decision": final_result.get("human_decision", {}).get("action") if final_result else None,
-                    "summary": summary,
-                    "final_result": final_result
-                }
-
-                workflows_list.append(workflow_info)
-
-            except Exception as e:
-                print(f"Error processing workflow {workflow.id}: {e}")
-                continue
-
-        return {"workflows": workflows_list}
+                    row = _workflow_row(workflow, summary, final_result)
+                except Exception as e:
+                    logger.error("Error processing workflow %s: %s", workflow.id, e)
+                    continue
+                if workflow.status in _TERMINAL_STATUSES and not any(
+                    isinstance(r, Exception) for r in results
+                ):
+                    _terminal_rows[key] = row
+            workflows_list.append(row)
+
+        # Returned as a response object so FastAPI skips jsonable_encoder and
+        # orjson serializes the rows' datetimes natively
+        return ORJSONResponse(content={
+            "workflows": workflows_list,
+            "next_cursor": base64.urlsafe_b64encode(next_token).decode() if next_token else None,
+        })
 
     except Exception as e:
-        print(f"Error listing workflows: {e}")
+        logger.error("Error listing workflows: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,6 +1,14 @@
 """Utilities module for backend services."""
 
 from .temporal_client import get_temporal_client
+from .http_session import get_http_session, close_http_session
 from . import model
+from . import json_codec
 
-__all__ = ["get_temporal_client", "model"]
+__all__ = [
+    "get_temporal_client",
+    "get_http_session",
+    "close_http_session",
+    "model",
+    "json_codec",
+]
@@ -0,0 +1,124 @@
+"""
+Async Cache Utility
+
+Cache-aside helper for data that activities fetch from external APIs:
+1. Fresh entries are served from memory for `ttl` seconds
+2. The last good value is kept for `stale_ttl` seconds and served when a
+   refresh fails (stale-if-error), so a retry after a transient upstream
+   failure can still complete
+3. Concurrent misses for the same key are coalesced into one upstream call
+   (single-flight), so a burst of identical requests costs one round-trip
+
+The cache is process-local: each worker keeps its own copy.
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one in-flight call.
+
+    The first caller starts the call; callers arriving while it is pending
+    await the same result (or exception). Cancelling one caller does not
+    cancel the shared call.
+    """
+
+    def __init__(self):
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Return the result of fn(*args), sharing it with concurrent callers for key."""
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args))
+            self._pending[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._pending.get(key) is task:
+            del self._pending[key]
+
+
+class AsyncTTLCache:
+    """
+    TTL cache for the results of coroutine functions.
+
+    All reads and writes happen on the event loop thread between awaits, so
+    no additional locking is required.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, stale_ttl: Optional[float] = None):
+        """
+        Args:
+            maxsize: Maximum number of entries kept in each tier
+            ttl: Seconds an entry is served without refetching
+            stale_ttl: Seconds the last good value may be served when a refetch
+                fails. Defaults to ttl (no stale window).
+        """
+        self._fresh = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._stale = TTLCache(maxsize=maxsize, ttl=max(stale_ttl or ttl, ttl))
+        self._in_flight = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the fresh value for key, or None on a miss."""
+        return self._fresh.get(key)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value as both the fresh and the last good value for key."""
+        self._fresh[key] = value
+        self._stale[key] = value
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size, e.g. for logging."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_hits": self.stale_hits,
+            "size": len(self._fresh),
+        }
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop key from both tiers (e.g. after the upstream data changed)."""
+        self._fresh.pop(key, None)
+        self._stale.pop(key, None)
+
+    async def get_or_fetch(
+        self, key: Hashable, fetch: Callable[..., Awaitable[Any]], *args: Any
+    ) -> Any:
+        """
+        Return the cached value for key, calling fetch(*args) on a miss.
+
+        Concurrent misses for the same key share a single fetch.
+
+        If fetch raises and a last good value is still inside the stale
+        window, that value is returned instead of propagating the error.
+        """
+        value = self._fresh.get(key)
+        if value is not None:
+            self.hits += 1
+            logger.debug("Cache HIT for %s", key)
+            return value
+
+        self.misses += 1
+        try:
+            value = await self._in_flight.do(key, fetch, *args)
+        except Exception as e:
+            stale = self._stale.get(key)
+            if stale is None:
+                raise
+            self.stale_hits += 1
+            logger.warning("Serving stale value for %s after fetch failure: %s", key, e)
+            return stale
+
+        self.set(key, value)
+        return value
@@ -0,0 +1,80 @@
+"""
+Circuit Breaker Utility
+
+Guards calls to a dependency that can go down for a while (e.g. the LLM
+server):
+1. Closed: calls go through; consecutive failures are counted
+2. Open: after `failure_threshold` consecutive failures, calls fail
+   immediately with CircuitOpenError for `reset_timeout` seconds instead of
+   waiting on connect timeouts
+3. Half-open: once `reset_timeout` has elapsed, a single call is let through
+   as a probe while concurrent calls keep failing with CircuitOpenError.
+   Success closes the circuit; failure re-opens it.
+
+State is process-local and only touched from the event loop thread.
+"""
+
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the dependency while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for coroutine functions."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        # Set while the half-open probe call is in flight
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """Return "closed", "open" or "half_open"."""
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    async def call(self, fn: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Return await fn(*args), or raise CircuitOpenError while the circuit is open."""
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError(
+                f"circuit open after {self.failures} consecutive failures, "
+                f"retrying in {self.opened_at + self.reset_timeout - time.monotonic():.1f}s"
+            )
+        if state == "half_open":
+            # Only one probe at a time, so the recovering dependency isn't hit
+            # by every caller that queued up during the cooldown
+            if self._probing:
+                raise CircuitOpenError("circuit half-open, probe call in flight")
+            self._probing = True
+
+        try:
+            result = await fn(*args)
+        except Exception:
+            self.failures += 1
+            # A failed half-open probe re-opens the circuit straight away
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            raise
+        finally:
+            # A cancelled probe leaves the circuit half-open for the next caller
+            if state == "half_open":
+                self._probing = False
+
+        self.failures = 0
+        self.opened_at = None
+        return result
@@ -0,0 +1,43 @@
+"""
+HTTP Session Utility
+
+Provides one pooled aiohttp ClientSession per process for calls to external
+data APIs. Reusing the session keeps TCP (and TLS) connections alive between
+requests instead of paying a fresh handshake on every fetch.
+
+The session is created lazily inside the running event loop and must be
+closed with close_http_session() when the process shuts down.
+"""
+
+import aiohttp
+from typing import Optional
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+async def get_http_session() -> aiohttp.ClientSession:
+    """
+    Return the process-wide HTTP session, creating it on first use.
+
+    Connection pool:
+        - limit=100: maximum concurrent connections across all hosts
+        - keepalive_timeout=30: idle connections are kept for 30 seconds
+        - ttl_dns_cache=300: DNS lookups are cached for 5 minutes
+    """
+    global _session
+
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, keepalive_timeout=30, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+    return _session
+
+
+async def close_http_session() -> None:
+    """Close the process-wide HTTP session and release pooled connections."""
+    global _session
+
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
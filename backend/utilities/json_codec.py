@@ -0,0 +1,42 @@
+"""
+JSON Codec Utility
+
+Provides a single JSON codec for API response parsing and cache keys:
+1. orjson (Rust implementation, roughly 2x faster decode) when installed
+2. The standard library json module otherwise
+
+Both backends raise JSONDecodeError (a ValueError subclass) on malformed input.
+"""
+
+try:
+    import orjson as _json_lib
+except ImportError:  # orjson is listed in requirements.txt but stays optional
+    import json as _json_lib
+
+JSONDecodeError = _json_lib.JSONDecodeError
+_HAS_ORJSON = _json_lib.__name__ == "orjson"
+
+
+def loads(data):
+    """
+    Decode a JSON document.
+
+    Args:
+        data: JSON text as str or bytes (orjson decodes bytes without a copy)
+
+    Returns:
+        The decoded Python object
+    """
+    return _json_lib.loads(data)
+
+
+def dumps_sorted(obj) -> bytes:
+    """
+    Encode obj as canonical JSON bytes with sorted keys.
+
+    Equal objects always produce equal bytes, which makes the output
+    suitable for building cache keys.
+    """
+    if _HAS_ORJSON:
+        return _json_lib.dumps(obj, option=_json_lib.OPT_SORT_KEYS)
+    return _json_lib.dumps(obj, sort_keys=True, separators=(",", ":")).encode()
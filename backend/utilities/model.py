@@ -1,24 +1,64 @@
+import functools
 import os
+import aiohttp
+from typing import Optional, Tuple
 from strands.models.ollama import OllamaModel
 from strands.models import BedrockModel
+from botocore.config import Config as BotocoreConfig
 from pydantic import BaseModel
+from .http_session import get_http_session
+
+# Read once at import; entry points call load_dotenv() before importing this module
+MODEL_PROVIDER = os.getenv("MODEL_PROVIDER", "ollama")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3:latest")
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434")
+# How long Ollama keeps the model loaded after a request (Ollama's default is 5m)
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "1h")
+AWS_BEDROCK_MODEL = os.getenv("AWS_BEDROCK_MODEL", "au.anthropic.claude-sonnet-4-5-20250929-v1:0")
+
 
 def get_model() -> BaseModel:
-    provider = os.getenv("MODEL_PROVIDER", "ollama")
+    return _build_model(*model_key())
 
-    if provider == "ollama":
-        return OllamaModel(
-            host=os.getenv("OLLAMA_URL", "http://localhost:11434"),
-            model_id=os.getenv("OLLAMA_MODEL", "llama3:latest")
-        )
+
+def model_key() -> Tuple[str, str, Optional[str]]:
+    """Return the (provider, model_id, host) identifying the configured model."""
+    if MODEL_PROVIDER == "ollama":
+        return (MODEL_PROVIDER, OLLAMA_MODEL, OLLAMA_URL)
     
-    elif provider == "aws-bedrock":
-        return BedrockModel(
-            model_id=os.getenv("AWS_BEDROCK_MODEL", "au.anthropic.claude-sonnet-4-5-20250929-v1:0"),
-        )
+    elif MODEL_PROVIDER == "aws-bedrock":
+        return (MODEL_PROVIDER, AWS_BEDROCK_MODEL, None)
     
     else:
         raise ValueError(
-            f"Unsupported MODEL_PROVIDER '{provider}'."
+            f"Unsupported MODEL_PROVIDER '{MODEL_PROVIDER}'."
             "Expected 'ollama' or 'aws-bedrock'."
-        )
\ No newline at end of file
+        )
+
+
+@functools.lru_cache(maxsize=4)
+def _build_model(provider: str, model_id: str, host: Optional[str] = None) -> BaseModel:
+    # Model clients are stateless between calls, so one instance per
+    # (provider, model_id, host) is shared instead of reconnecting per call
+    if provider == "ollama":
+        return OllamaModel(host=host, model_id=model_id, keep_alive=OLLAMA_KEEP_ALIVE)
+    # The cached model's boto client serves every concurrent activity, so
+    # allow more pooled connections than botocore's default of 10
+    return BedrockModel(
+        model_id=model_id,
+        boto_client_config=BotocoreConfig(max_pool_connections=50),
+    )
+
+
+async def warm_up() -> None:
+    """Load the configured Ollama model ahead of the first request (no-op for Bedrock)."""
+    if MODEL_PROVIDER != "ollama":
+        return
+    session = await get_http_session()
+    # A generate request without a prompt only loads the model into memory
+    async with session.post(
+        f"{OLLAMA_URL}/api/generate",
+        json={"model": OLLAMA_MODEL, "keep_alive": OLLAMA_KEEP_ALIVE},
+        timeout=aiohttp.ClientTimeout(total=300),
+    ) as response:
+        response.raise_for_status()
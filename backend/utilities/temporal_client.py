@@ -6,16 +6,26 @@ This module provides a unified interface for connecting to either:
 2. Temporal Cloud with API key authentication
 
 The connection type is determined by the presence of TEMPORAL_API_KEY.
+
+One client (and gRPC channel) is created per namespace and reused for the
+life of the process; Client is safe for concurrent use.
 """
 
+import asyncio
+import logging
 import os
 from temporalio.client import Client, TLSConfig
-from typing import Optional
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_clients: Dict[str, Client] = {}
+_connect_lock = asyncio.Lock()
 
 
 async def get_temporal_client(namespace: Optional[str] = None) -> Client:
     """
-    Create and return a Temporal client connection.
+    Return the process-wide Temporal client, connecting on first use.
 
     Automatically detects whether to connect to local Temporal or Temporal Cloud
     based on the presence of TEMPORAL_API_KEY environment variable.
@@ -40,14 +50,29 @@ async def get_temporal_client(namespace: Optional[str] = None) -> Client:
             - If not set: Connects to local Temporal without authentication
     """
 
+    namespace_value = namespace or os.getenv("TEMPORAL_NAMESPACE", "default")
+    client = _clients.get(namespace_value)
+    if client is not None:
+        return client
+
+    # Concurrent first callers wait for a single connection attempt
+    async with _connect_lock:
+        client = _clients.get(namespace_value)
+        if client is None:
+            client = await _connect(namespace_value)
+            _clients[namespace_value] = client
+    return client
+
+
+async def _connect(namespace_value: str) -> Client:
+    """Open a new Temporal client connection for the given namespace."""
     # Get common configuration
     address = os.getenv("TEMPORAL_ADDRESS", "localhost:7233")
-    namespace_value = namespace or os.getenv("TEMPORAL_NAMESPACE", "default")
     api_key = os.getenv("TEMPORAL_API_KEY")
 
     if api_key:
         # Temporal Cloud configuration (with API key)
-        print(f"Connecting to Temporal Cloud at {address} (namespace: {namespace_value})")
+        logger.debug("Connecting to Temporal Cloud at %s (namespace: %s)", address, namespace_value)
 
         # Connect to Temporal Cloud with TLS and API key authentication
         client = await Client.connect(
@@ -60,12 +85,12 @@ async def get_temporal_client(namespace: Optional[str] = None) -> Client:
             }
         )
 
-        print(f"Successfully connected to Temporal Cloud")
+        logger.info("Connected to Temporal Cloud at %s (namespace: %s)", address, namespace_value)
         return client
 
     else:
         # Local Temporal configuration (no API key)
-        print(f"Connecting to local Temporal at {address} (namespace: {namespace_value})")
+        logger.debug("Connecting to local Temporal at %s (namespace: %s)", address, namespace_value)
 
         # Connect to local Temporal server (no TLS, no auth)
         client = await Client.connect(
@@ -73,5 +98,5 @@ async def get_temporal_client(namespace: Optional[str] = None) -> Client:
             namespace=namespace_value
         )
 
-        print(f"Successfully connected to local Temporal")
+        logger.info("Connected to local Temporal at %s (namespace: %s)", address, namespace_value)
         return client
@@ -1,18 +1,36 @@
 import asyncio
+import logging
 import os
 import sys
 from temporalio import worker
 from dotenv import load_dotenv
 
-# Import the actual workflows and activities
-from workflows import SupervisorWorkflow
-import activities
-from utilities import get_temporal_client
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
 
+# Load .env before importing modules that read configuration at import time
 load_dotenv()
 
+# Import the actual workflows and activities
+from workflows import SupervisorWorkflow, SupervisorBatchWorkflow
+import activities
+from utilities import get_temporal_client, close_http_session, model
+
 TASK_QUEUE = os.getenv("TEMPORAL_TASK_QUEUE", "loan-underwriter-queue")
 
+logger = logging.getLogger("loan.worker")
+
+
+async def warm_up_model():
+    # Cold-loading the model can take tens of seconds; do it before the first decision needs it
+    try:
+        await model.warm_up()
+        logger.info("LLM model warmed up")
+    except Exception as e:
+        logger.warning("LLM warm-up failed: %s", e)
+
 
 async def run_worker():
     # Create client using connection utility (supports both local and cloud)
@@ -22,29 +40,55 @@ async def run_worker():
     w = worker.Worker(
         temporal_client,
         task_queue=TASK_QUEUE,
-        workflows=[SupervisorWorkflow],
+        workflows=[SupervisorWorkflow, SupervisorBatchWorkflow],
         activities=[
+            activities.fetch_and_assess,
+            activities.fetch_all_sources,
+            activities.fetch_all_sources_bulk,
             activities.fetch_bank_account,
             activities.fetch_documents,
             activities.fetch_credit_report_cibil,
             activities.fetch_credit_report_experian,
+            activities.compute_assessments,
+            activities.aggregate_and_decide,
+            # Only scheduled by pre-pipeline-v2 workflow runs replaying the old path
             activities.income_assessment,
             activities.expense_assessment,
-            activities.credit_assessment,
-            activities.aggregate_and_decide
-        ]
+            activities.credit_assessment
+        ],
+        # Keep up to 1000 workflows in the sticky cache so queries from the
+        # API hit cached state instead of replaying history
+        max_cached_workflows=1000,
+        # Activities are async and I/O bound, so many can share the event loop
+        max_concurrent_workflow_tasks=200,
+        max_concurrent_activities=200,
     )
 
-    print("Worker started, polling task queue:", TASK_QUEUE)
-    await w.run()
+    logger.info("Worker started, polling task queue: %s", TASK_QUEUE)
+    warm_up = asyncio.create_task(warm_up_model())
+    try:
+        await w.run()
+    finally:
+        warm_up.cancel()
+        # Release pooled connections used by the data-fetch activities
+        await close_http_session()
 
 
 def main():
-    # Use asyncio.run() which handles event loop creation/cleanup automatically
+    # Also surfaces activity.logger / workflow.logger output; set LOG_LEVEL=WARNING in production
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    # uvloop.run()/asyncio.run() handle event loop creation/cleanup automatically;
+    # uvloop's faster loop is used whenever it is installed
     try:
-        asyncio.run(run_worker())
+        if uvloop is not None:
+            uvloop.run(run_worker())
+        else:
+            asyncio.run(run_worker())
     except KeyboardInterrupt:
-        print("\nWorker stopped by user")
+        logger.info("Worker stopped by user")
 
 
 if __name__ == "__main__":
@@ -1,8 +1,53 @@
+import asyncio
+import os
 from temporalio import workflow
 from temporalio.common import RetryPolicy
-from temporalio.exceptions import ActivityError
+from temporalio.exceptions import ActivityError, WorkflowAlreadyStartedError
+from temporalio.workflow import ParentClosePolicy
 from datetime import timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+
+__all__ = ["SupervisorWorkflow", "SupervisorBatchWorkflow"]
+
+# How long an application waits for a human review signal before closing
+REVIEW_DEADLINE = timedelta(days=7)
+
+# Applicants per fetch_all_sources_bulk activity in SupervisorBatchWorkflow
+BATCH_SHARD_SIZE = 20
+
+# Attempts per activity under the default and decision retry policies. With a
+# 1s initial interval doubling to a 10s cap, 5 attempts (~1+2+4+8s of backoff)
+# ride out transient failures; beyond that every attempt waits the full 10s and
+# just burns provider/LLM budget. Permanent failures skip retries entirely via
+# non_retryable_error_types. Read when the worker imports this module; workflow
+# code itself may not touch the environment, hence the unrestricted block.
+with workflow.unsafe.sandbox_unrestricted():
+    MAX_ACTIVITY_ATTEMPTS = int(os.getenv("TEMPORAL_MAX_ATTEMPTS", "5"))
+
+# Marks runs started on the concurrent pipeline (fetch_and_assess, speculative
+# Experian, hard-reject gate, bounded review wait). Runs without the marker in
+# their history were started by an older worker and replay _run_legacy, which
+# issues the original command sequence. Once no pre-v2 runs remain open,
+# switch to workflow.deprecate_patch(PIPELINE_V2_PATCH), then drop _run_legacy
+# and the per-assessment activities.
+PIPELINE_V2_PATCH = "pipeline-v2"
+
+# Credit score below which an application is rejected without further assessment
+HARD_REJECT_CREDIT_SCORE = 400
+
+
+def _hard_reject_reason(bank: Dict[str, Any], credit: Dict[str, Any]) -> Optional[str]:
+    """
+    Return why the application can be rejected from Phase 1 data alone, or None.
+
+    Pure function of its inputs (no I/O, no clock), so it is replay-safe.
+    """
+    score = (credit or {}).get("score")
+    if score is not None and score < HARD_REJECT_CREDIT_SCORE:
+        return f"Credit score {score} is below the hard floor of {HARD_REJECT_CREDIT_SCORE}"
+    if not (bank or {}).get("accounts"):
+        return "No bank account on record"
+    return None
 
 
 @workflow.defn
@@ -37,11 +82,14 @@ class SupervisorWorkflow:
     WORKFLOW PHASES:
     ----------------
     Phase 1: Data Acquisition (Temporal orchestrates, Strands fetches)
-             - Bank account data (HTTP agent)
-             - Document metadata (HTTP agent)
-             - Credit reports with fallback (HTTP agent + validation)
-
-    Phase 2: Parallel Analysis (Temporal coordinates, Strands analyzes)
+             - Bank account, documents and CIBIL fetched concurrently (HTTP agent)
+             - Experian fetched speculatively; used when CIBIL fails,
+               cancelled otherwise (HTTP agent + validation)
+             - Hard-reject gate: a credit score below HARD_REJECT_CREDIT_SCORE
+               or no bank account skips Phases 2-3 with a reject suggestion
+
+    Phase 2: Specialist Analysis (fused into Phase 1's activity when CIBIL
+             succeeds, otherwise a single activity)
              - Income assessment
              - Expense assessment
              - Credit assessment
@@ -52,8 +100,8 @@ class SupervisorWorkflow:
 
     Phase 4: Human Review (Temporal manages state)
              - Pause workflow
-             - Wait for human signal
-             - Resume with decision
+             - Wait for human signal (up to REVIEW_DEADLINE)
+             - Resume with decision, or close as "timeout"
     """
 
     def __init__(self) -> None:
@@ -63,38 +111,66 @@ class SupervisorWorkflow:
         State Management:
             - _human_decision_received: Signal flag for human review completion
             - _human_decision: Stores the human reviewer's decision
-            - _summary: Aggregated data for human review
+            - _summary: Aggregated data for human review, filled in phase by phase
             - _final_result: Complete workflow outcome
+            - _progress: Current pipeline stage, exposed via get_progress
 
         Retry Policy:
             - Exponential backoff with configurable parameters
             - Applied to all activities by default
-            - Can be overridden per activity (e.g., CIBIL has limited retries)
+            - Can be overridden per activity (e.g., provider fetches use
+              _fetch_retry_policy with jittered backoff)
         """
         # Human-in-the-loop state
         self._human_decision_received = False
         self._human_decision: Optional[Dict[str, Any]] = None
         self._summary: Optional[Dict[str, Any]] = None
         self._final_result: Optional[Dict[str, Any]] = None
+        self._progress: Dict[str, Any] = {"stage": "fetching_sources"}
 
         # Global retry policy for activities
         # This is Temporal's mechanism for handling transient failures
+        # RetryPolicy has no jitter setting; activities that call shared
+        # upstreams (providers, the LLM) randomize their own retry delay via
+        # ApplicationError.next_retry_delay, which overrides this backoff
         self._default_retry_policy = RetryPolicy(
             initial_interval=timedelta(seconds=1),
             maximum_interval=timedelta(seconds=10),
             backoff_coefficient=2.0,
-            maximum_attempts=10
+            maximum_attempts=MAX_ACTIVITY_ATTEMPTS,
+            # A provider rejecting the request (unknown applicant, auth) fails
+            # the same way every time, so don't spend attempts on it
+            non_retryable_error_types=["InvalidApplicantError"]
+        )
+
+        # Retry policy for provider-facing fetch activities
+        # Starts fast and backs off exponentially; the activities add full
+        # jitter on top via ApplicationError.next_retry_delay so concurrent
+        # workflows do not hammer a recovering provider in lockstep
+        self._fetch_retry_policy = RetryPolicy(
+            initial_interval=timedelta(milliseconds=100),
+            maximum_interval=timedelta(seconds=10),
+            backoff_coefficient=2.0,
+            maximum_attempts=MAX_ACTIVITY_ATTEMPTS,
+            non_retryable_error_types=["InvalidApplicantError"]
         )
 
     @workflow.run
-    async def run(self, application: Dict[str, Any]):
+    async def run(self, application: Dict[str, Any], prefetched: Optional[Dict[str, Any]] = None):
         """
         Main workflow execution logic.
 
         This method orchestrates the entire loan underwriting process,
         demonstrating Temporal's orchestration capabilities combined with
         Strands agents' intelligence within each activity.
+
+        Args:
+            application: The loan application
+            prefetched: Phase 1 sources already fetched in bulk by
+                SupervisorBatchWorkflow (fetch_all_sources shape), if any
         """
+        if not workflow.patched(PIPELINE_V2_PATCH):
+            return await self._run_legacy(application)
 
         # ═══════════════════════════════════════════════════════════
         # PHASE 1: DATA ACQUISITION
@@ -102,88 +178,233 @@ class SupervisorWorkflow:
         # Temporal orchestrates the execution and retries
         # Strands agents handle HTTP requests and data validation
 
-        # Activity 1: Fetch bank account data
-        # - Temporal: Manages timeout, retries, durability
-        # - Strands: Makes HTTP request, validates account structure
+        if prefetched is None:
+            # Activity 1: Fetch bank, documents and CIBIL concurrently
+            # - Temporal: Manages timeout, retries, durability
+            # - Strands: Makes the HTTP requests, validates each payload
+            # The sources are independent, so one activity overlaps all three
+            # requests instead of paying for three sequential round-trips. When
+            # CIBIL answers, the same activity also runs the Phase 2 assessments.
+            sources_handle = workflow.start_activity(
+                "fetch_and_assess",
+                application,
+                start_to_close_timeout=timedelta(seconds=60),
+                retry_policy=self._fetch_retry_policy
+            )
+
+            # Activity 2: Credit report provider fallback
+            # ════════════════════════════════════════════════════════
+            # KEY ARCHITECTURE PATTERN - FALLBACK ORCHESTRATION:
+            # - Temporal: Orchestrates provider-level fallback (CIBIL → Experian)
+            # - Strands: Validates data quality consistently across providers
+            # ════════════════════════════════════════════════════════
+            # Experian is requested speculatively alongside CIBIL, so a CIBIL
+            # outage does not add the Experian round-trip to the critical path.
+            # Costs one extra bureau call per loan when CIBIL is healthy.
+            experian_handle = workflow.start_activity(
+                "fetch_credit_report_experian",
+                application["applicant_id"],
+                start_to_close_timeout=timedelta(seconds=60),
+                retry_policy=self._fetch_retry_policy
+            )
+
+            sources = await sources_handle
+        else:
+            # Phase 1 was already fetched in bulk by SupervisorBatchWorkflow
+            sources = {**prefetched, "assessments": None}
+            experian_handle = None
+
+        bank = sources["bank"]
+        docs = sources["docs"]
+        credit = sources["credit"]
+
+        if credit is None:
+            # TEMPORAL ORCHESTRATION: CIBIL failed, fall back to secondary provider
+            workflow.logger.info("CIBIL unavailable, falling back to Experian: %s", sources["credit_error"])
+            self._progress = {"stage": "credit_fallback"}
+            if experian_handle is None:
+                experian_handle = workflow.start_activity(
+                    "fetch_credit_report_experian",
+                    application["applicant_id"],
+                    start_to_close_timeout=timedelta(seconds=60),
+                    retry_policy=self._fetch_retry_policy
+                )
+            credit = await experian_handle
+        elif experian_handle is not None:
+            experian_handle.cancel()
+
+        # Publish each phase's results as soon as they exist, so get_summary
+        # shows reviewers an evolving picture instead of None until Phase 3.
+        # "phase" says how far the summary has got.
+        self._summary = {
+            "phase": "sources_loaded",
+            "application": application,
+            "bank": bank,
+            "docs": docs,
+            "credit": credit,
+        }
+
+        # Cheap deterministic gate: applications that fail a hard rule are
+        # routed straight to review with a reject suggestion, skipping the
+        # assessments and the LLM decision
+        reject_reason = _hard_reject_reason(bank, credit)
+        if reject_reason is not None:
+            workflow.logger.info("Hard reject, skipping Phases 2-3: %s", reject_reason)
+            decision = {
+                "recommendation": "reject",
+                "explanation": reject_reason,
+                "llm_error": False,
+                "raw_output": reject_reason,
+            }
+        else:
+            # ═══════════════════════════════════════════════════════════
+            # PHASE 2: SPECIALIST ASSESSMENTS
+            # ═══════════════════════════════════════════════════════════
+            # Strands agents perform specialized analysis (future: multi-agent swarms)
+            # The three assessments only read data fetched in Phase 1. With CIBIL
+            # data they already ran inside fetch_and_assess; on the Experian path
+            # they run together in one activity over the fallback report.
+            assessments = sources["assessments"]
+            if assessments is None:
+                self._progress = {"stage": "assessing"}
+                assessments = await workflow.execute_activity(
+                    "compute_assessments",
+                    {"application": application, "bank": bank, "credit": credit},
+                    start_to_close_timeout=timedelta(seconds=90),
+                    retry_policy=self._default_retry_policy
+                )
+            income_res = assessments["income"]
+            expense_res = assessments["expense"]
+            credit_res = assessments["credit"]
+            self._summary = {
+                **self._summary,
+                "phase": "assessed",
+                "assessments": {
+                    "income": income_res,
+                    "expense": expense_res,
+                    "credit": credit_res
+                },
+            }
+
+            # ═══════════════════════════════════════════════════════════
+            # PHASE 3: DECISION AGGREGATION
+            # ═══════════════════════════════════════════════════════════
+            # Temporal ensures reliable execution
+            # Strands agent (with LLM) synthesizes all data into a recommendation
+
+            self._progress = {"stage": "deciding"}
+            decision = await workflow.execute_activity(
+                "aggregate_and_decide",
+                {
+                    "application": application,
+                    "income": income_res,
+                    "expense": expense_res,
+                    "credit": credit_res,
+                    "docs": docs
+                },
+                start_to_close_timeout=timedelta(seconds=1200),
+                # The activity heartbeats while waiting on the LLM, so a lost
+                # worker is detected after 30s instead of at start_to_close_timeout
+                heartbeat_timeout=timedelta(seconds=30),
+                retry_policy=RetryPolicy(
+                    maximum_interval=timedelta(seconds=10),
+                    maximum_attempts=MAX_ACTIVITY_ATTEMPTS
+                )
+            )
+
+        # ═══════════════════════════════════════════════════════════
+        # PHASE 4: HUMAN-IN-THE-LOOP REVIEW
+        # ═══════════════════════════════════════════════════════════
+        # TEMPORAL'S KEY STRENGTH: Durable wait for human signal
+        # Workflow can pause for hours/days without consuming resources
+
+        # Aggregate all data for human reviewer
+        summary = {**self._summary, "phase": "decided", "suggested_decision": decision}
+        self._summary = summary
+        self._progress = {"stage": "awaiting_review"}
+
+        # TEMPORAL ORCHESTRATION: Durable wait for human signal
+        # This is where Temporal shines - workflow can pause for days. The
+        # review SLA bounds the wait with a durable timer, so abandoned
+        # applications close instead of staying open forever
+        try:
+            await workflow.wait_condition(
+                lambda: self._human_decision_received,
+                timeout=REVIEW_DEADLINE,
+            )
+            # Human decision received via signal
+            decision = self._human_decision
+        except asyncio.TimeoutError:
+            workflow.logger.info("No human review within %s, closing application", REVIEW_DEADLINE)
+            decision = {"action": "timeout", "note": f"No review within {REVIEW_DEADLINE}"}
+            self._human_decision = decision
+
+        # Create final result with all context
+        final = {
+            "summary": summary,
+            "human_decision": decision
+        }
+        self._final_result = final
+        self._progress = {"stage": "completed"}
+
+        return final
+
+    async def _run_legacy(self, application: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Original sequential pipeline, kept so runs started before
+        PIPELINE_V2_PATCH replay deterministically. Do not change the order or
+        names of the activities scheduled here.
+        """
+        applicant_id = application["applicant_id"]
         bank = await workflow.execute_activity(
             "fetch_bank_account",
-            application["applicant_id"],
+            applicant_id,
             start_to_close_timeout=timedelta(seconds=60),
             retry_policy=self._default_retry_policy
         )
-
-        # Activity 2: Fetch document metadata
-        # - Temporal: Ensures reliable execution
-        # - Strands: Fetches and validates document completeness
         docs = await workflow.execute_activity(
             "fetch_documents",
-            application["applicant_id"],
+            applicant_id,
             start_to_close_timeout=timedelta(seconds=60),
             retry_policy=self._default_retry_policy
         )
-
-        # Activity 3: Fetch credit report with provider fallback
-        # ════════════════════════════════════════════════════════
-        # KEY ARCHITECTURE PATTERN - FALLBACK ORCHESTRATION:
-        # - Temporal: Orchestrates provider-level fallback (CIBIL → Experian)
-        # - Strands: Validates data quality consistently across providers
-        # ════════════════════════════════════════════════════════
         try:
-            # Try primary provider (CIBIL) with limited retries
             credit = await workflow.execute_activity(
                 "fetch_credit_report_cibil",
-                application["applicant_id"],
+                applicant_id,
                 start_to_close_timeout=timedelta(seconds=60),
-                retry_policy=RetryPolicy(
-                    maximum_attempts=2  # Fail fast to try fallback
-                )
+                retry_policy=RetryPolicy(maximum_attempts=2)
             )
-        except ActivityError as e:
-            # TEMPORAL ORCHESTRATION: Fallback to secondary provider
+        except ActivityError:
             credit = await workflow.execute_activity(
                 "fetch_credit_report_experian",
-                application["applicant_id"],
+                applicant_id,
                 start_to_close_timeout=timedelta(seconds=60),
                 retry_policy=self._default_retry_policy
             )
 
-        # ═══════════════════════════════════════════════════════════
-        # PHASE 2: PARALLEL SPECIALIST ASSESSMENTS
-        # ═══════════════════════════════════════════════════════════
-        # Temporal coordinates parallel execution
-        # Strands agents perform specialized analysis (future: multi-agent swarms)
-        # TEMPORAL ORCHESTRATION: Launch activities in parallel
-        # These are independent assessments that can run concurrently
-        income_task = workflow.execute_activity(
+        # Scheduled one after another, as the original awaited them in turn
+        self._progress = {"stage": "assessing"}
+        income_res = await workflow.execute_activity(
             "income_assessment",
             {"application": application, "bank": bank, "credit": credit},
             start_to_close_timeout=timedelta(seconds=90),
             retry_policy=self._default_retry_policy
         )
-        expense_task = workflow.execute_activity(
+        expense_res = await workflow.execute_activity(
             "expense_assessment",
             {"application": application, "bank": bank},
             start_to_close_timeout=timedelta(seconds=90),
             retry_policy=self._default_retry_policy
         )
-        credit_task = workflow.execute_activity(
+        credit_res = await workflow.execute_activity(
             "credit_assessment",
             {"application": application, "credit": credit},
             start_to_close_timeout=timedelta(seconds=90),
             retry_policy=self._default_retry_policy
         )
 
-        # Wait for all parallel tasks to complete
-        income_res = await income_task
-        expense_res = await expense_task
-        credit_res = await credit_task
-
-        # ═══════════════════════════════════════════════════════════
-        # PHASE 3: DECISION AGGREGATION
-        # ═══════════════════════════════════════════════════════════
-        # Temporal ensures reliable execution
-        # Strands agent (with LLM) synthesizes all data into a recommendation
-
+        self._progress = {"stage": "deciding"}
         decision = await workflow.execute_activity(
             "aggregate_and_decide",
             {
@@ -195,18 +416,13 @@ class SupervisorWorkflow:
             },
             start_to_close_timeout=timedelta(seconds=1200),
             retry_policy=RetryPolicy(
-                maximum_interval=timedelta(seconds=10)
+                maximum_interval=timedelta(seconds=10),
+                maximum_attempts=MAX_ACTIVITY_ATTEMPTS
             )
         )
 
-        # ═══════════════════════════════════════════════════════════
-        # PHASE 4: HUMAN-IN-THE-LOOP REVIEW
-        # ═══════════════════════════════════════════════════════════
-        # TEMPORAL'S KEY STRENGTH: Durable wait for human signal
-        # Workflow can pause for hours/days without consuming resources
-
-        # Aggregate all data for human reviewer
         summary = {
+            "phase": "decided",
             "application": application,
             "bank": bank,
             "docs": docs,
@@ -219,20 +435,17 @@ class SupervisorWorkflow:
             "suggested_decision": decision,
         }
         self._summary = summary
+        self._progress = {"stage": "awaiting_review"}
 
-        # TEMPORAL ORCHESTRATION: Durable wait for human signal
-        # This is where Temporal shines - workflow can pause indefinitely
+        # No review deadline: a timer here would be a command the old history lacks
         await workflow.wait_condition(lambda: self._human_decision_received)
 
-        # Human decision received via signal
-        decision = self._human_decision
-
-        # Create final result with all context
         final = {
             "summary": summary,
-            "human_decision": decision
+            "human_decision": self._human_decision
         }
         self._final_result = final
+        self._progress = {"stage": "completed"}
 
         return final
 
@@ -251,6 +464,8 @@ class SupervisorWorkflow:
             decision: Human reviewer's decision
                      {"action": "approve"|"reject", "note": "..."}
         """
+        # Store the decision before raising the flag: wait_condition (and any
+        # query) that sees the flag set must also see the decision
         self._human_decision = decision
         self._human_decision_received = True
 
@@ -266,18 +481,13 @@ class SupervisorWorkflow:
         - Used by UI to display data for review
 
         Returns:
-            Summary dict with all assessment data, or None if not ready
+            Summary dict with the data gathered so far, or None before Phase 1
+            completes. "phase" is "sources_loaded", "assessed" or "decided";
+            "suggested_decision" is only present once decided.
         """
-        if self._summary is None:
-            return None
-        return {
-            "application": self._summary.get("application"),
-            "bank": self._summary.get("bank"),
-            "docs": self._summary.get("docs"),
-            "credit": self._summary.get("credit"),
-            "assessments": self._summary.get("assessments"),
-            "suggested_decision": self._summary.get("suggested_decision")
-        }
+        # run() keeps _summary in exactly the query's shape, so it is returned
+        # as-is instead of being copied key by key on every query
+        return self._summary
 
     @workflow.query
     def get_final_result(self) -> Optional[Dict[str, Any]]:
@@ -287,9 +497,95 @@ class SupervisorWorkflow:
         Returns:
             Final result with summary and human decision, or None if not complete
         """
-        if self._final_result is None:
-            return None
-        return {
-            "summary": self._final_result.get("summary"),
-            "human_decision": self._final_result.get("human_decision")
-        }
+        return self._final_result
+
+    @workflow.query
+    def get_progress(self) -> Dict[str, Any]:
+        """
+        Query handler to retrieve the current pipeline stage.
+
+        Returns:
+            {"stage": "fetching_sources"|"credit_fallback"|"assessing"|
+             "deciding"|"awaiting_review"|"completed"}
+        """
+        return self._progress
+
+
+@workflow.defn
+class SupervisorBatchWorkflow:
+    """
+    Temporal workflow that underwrites a batch of loan applications.
+
+    ARCHITECTURE NOTE - BATCHED DATA ACQUISITION:
+    - Phase 1 for the whole batch is fetched up front, one
+      fetch_all_sources_bulk activity per BATCH_SHARD_SIZE applicants
+      instead of one activity (and one task-queue round-trip) per applicant
+    - Each application then continues in its own child SupervisorWorkflow
+      with the prefetched sources, so per-loan assessment, LLM decision,
+      human review, queries and workflow ids ("loan-<applicant_id>") are
+      exactly those of a single submission
+    - Children are abandoned on completion of the batch: the batch finishes
+      once every loan has started, while reviews happen at their own pace
+    """
+
+    def __init__(self):
+        # Loan workflow ids this batch started, in start order
+        self._started: List[str] = []
+
+    @workflow.run
+    async def run(self, applications: List[Dict[str, Any]]) -> List[str]:
+        """
+        Returns:
+            Workflow ids of the started loan workflows
+        """
+        shards = [
+            applications[i:i + BATCH_SHARD_SIZE]
+            for i in range(0, len(applications), BATCH_SHARD_SIZE)
+        ]
+        shard_results = await asyncio.gather(*(
+            workflow.execute_activity(
+                "fetch_all_sources_bulk",
+                [app["applicant_id"] for app in shard],
+                start_to_close_timeout=timedelta(seconds=120),
+                retry_policy=RetryPolicy(maximum_attempts=MAX_ACTIVITY_ATTEMPTS)
+            )
+            for shard in shards
+        ))
+        prefetched: Dict[str, Any] = {}
+        for result in shard_results:
+            prefetched.update(result)
+
+        for app in applications:
+            sources = prefetched.get(app["applicant_id"])
+            if sources is not None and "error" in sources:
+                # Bank or documents failed in bulk; the child fetches (and
+                # retries) Phase 1 on its own
+                sources = None
+
+            workflow_id = f"loan-{app['applicant_id']}"
+            try:
+                await workflow.start_child_workflow(
+                    SupervisorWorkflow.run,
+                    args=[app, sources],
+                    id=workflow_id,
+                    parent_close_policy=ParentClosePolicy.ABANDON,
+                )
+            except WorkflowAlreadyStartedError:
+                # Same applicant already in progress (duplicate in the batch
+                # or a separate submission); leave that run alone
+                workflow.logger.info("Loan workflow already running: %s", workflow_id)
+                continue
+            self._started.append(workflow_id)
+
+        return self._started
+
+    @workflow.query
+    def get_started_workflow_ids(self) -> List[str]:
+        """
+        Query handler to retrieve the loan workflows started so far.
+
+        Returns:
+            Workflow ids started by this batch; duplicates and applicants
+            already in progress are not included
+        """
+        return self._started
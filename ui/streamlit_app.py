@@ -1,11 +1,388 @@
+import functools
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import pandas as pd
 import requests
-from typing import Any, Dict, Optional
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, List, Optional, Tuple
+from urllib3.util.retry import Retry
+
+# No spinner: this runs before st.set_page_config, which must be the first
+# element the script emits
+@st.cache_resource(show_spinner=False)
+def _api_url() -> str:
+    """Backend URL from secrets.toml, read once per server process rather than on every rerun."""
+    try:
+        return st.secrets.get("api_url", "http://localhost:8000")
+    except Exception:  # missing or unreadable secrets.toml
+        return "http://localhost:8000"
+
+
+API_URL = _api_url()
+
+
+@st.cache_resource
+def _api() -> requests.Session:
+    """Shared HTTP session for backend calls; keeps connections alive across reruns and clicks."""
+    session = requests.Session()
+    # urllib3 only retries idempotent methods by default, so POSTs are sent once;
+    # GETs are also retried on gateway errors from a restarting API
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504), raise_on_status=False)
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+@st.cache_resource
+def _background_pool() -> ThreadPoolExecutor:
+    """Threads for slow backend calls, so they don't block the script thread."""
+    return ThreadPoolExecutor(max_workers=2)
+
+
+def _submit_in_background(fn, *args: Any) -> Future:
+    """Run fn(*args) on the background pool, bound to the current session's script context."""
+    ctx = get_script_run_ctx()
+
+    def run():
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fn(*args)
+
+    return _background_pool().submit(run)
+
+
+class _ETagStore:
+    """Bounded LRU of (ETag, body) per workflow, shared by all sessions of this server."""
+
+    def __init__(self, maxsize: int = 64):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[str, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, etag: str, body: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+@st.cache_resource
+def _summary_etags() -> _ETagStore:
+    return _ETagStore()
+
+
+@st.cache_data(ttl=15)
+def fetch_summary(workflow_id: str) -> Dict[str, Any]:
+    """
+    Fetch a workflow summary; reruns within 15s reuse the cached response.
+
+    Refetches are conditional (If-None-Match), so an unchanged summary costs a
+    bodiless 304 instead of the full payload.
+    """
+    etags = _summary_etags()
+    cached = etags.get(workflow_id)
+    headers = {"If-None-Match": cached[0]} if cached else {}
+    r = _api().get(f"{API_URL}/workflow/{workflow_id}/summary", headers=headers, timeout=10)
+    if r.status_code == 304 and cached:
+        return cached[1]
+    r.raise_for_status()
+    data = r.json()
+    etag = r.headers.get("ETag")
+    if etag:
+        etags.put(workflow_id, etag, data)
+    return data
+
+
+# Upper bound on workflow rows loaded into the Workflows tab, fetched in pages
+_MAX_WORKFLOW_ROWS = 500
+_WORKFLOW_PAGE_SIZE = 100
+
+
+@st.cache_data(ttl=10, show_spinner=False)
+def fetch_workflows() -> Dict[str, Any]:
+    """
+    Fetch the workflow list, following next_cursor up to _MAX_WORKFLOW_ROWS rows.
+
+    Refreshes within 10s (from any session) reuse the cached response.
+    "truncated" is True when more workflows exist than were loaded.
+    """
+    rows: List[Dict[str, Any]] = []
+    cursor = None
+    while True:
+        params = {"limit": _WORKFLOW_PAGE_SIZE}
+        if cursor:
+            params["cursor"] = cursor
+        r = _api().get(f"{API_URL}/workflows", params=params, timeout=30)
+        r.raise_for_status()
+        page = r.json()
+        rows.extend(page.get("workflows", []))
+        cursor = page.get("next_cursor")
+        if not cursor or len(rows) >= _MAX_WORKFLOW_ROWS:
+            break
+    return {"workflows": rows[:_MAX_WORKFLOW_ROWS], "truncated": cursor is not None}
+
+
+@functools.lru_cache(maxsize=512)
+def _pretty(key: str) -> str:
+    """Turn a snake_case field name into a display label ("credit_score" -> "Credit Score")."""
+    return key.replace('_', ' ').title()
+
+
+# Characters st.markdown would interpret: "$" starts LaTeX, "*", "_" and "`"
+# format text, "|" splits table cells. Backslash goes first so escapes aren't doubled.
+_MD_SPECIAL = ("\\", "$", "*", "_", "`", "|")
+
+
+def _md_cell(value: Any) -> str:
+    """Escape value as literal text in a single-line markdown table cell."""
+    text = str(value)
+    for char in _MD_SPECIAL:
+        text = text.replace(char, "\\" + char)
+    # Fold newlines so multi-line values can't break the table
+    return " ".join(text.split())
+
+
+def _dict_to_md_table(d: Dict[str, Any]) -> str:
+    """Render a flat dict as one markdown table, instead of one widget per field."""
+    lines = ["| Field | Value |", "|---|---|"]
+    for key, value in d.items():
+        lines.append(f"| {_md_cell(_pretty(key))} | {_md_cell(value)} |")
+    return "\n".join(lines)
+
+
+def fetch_progress(workflow_id: str) -> Optional[str]:
+    """Return the workflow's current pipeline stage, or None if it can't be queried."""
+    try:
+        r = _api().get(f"{API_URL}/workflow/{workflow_id}/progress", timeout=10)
+        r.raise_for_status()
+        return (r.json().get("progress") or {}).get("stage")
+    except requests.RequestException:
+        return None
+
+
+@st.fragment
+def render_decision_buttons(workflow_id: str) -> None:
+    """Approve/reject controls; a click reruns only this fragment, not the whole summary view."""
+    st.markdown("## 💼 Make Your Decision")
+    st.markdown("*Review all information above and make your final decision:*")
+
+    decision_col1, decision_col2, decision_col3 = st.columns([2, 1, 2])
+
+    with decision_col1:
+        if st.button("✅ **APPROVE LOAN**", type="primary", use_container_width=True):
+            try:
+                r = _api().post(f"{API_URL}/workflow/{workflow_id}/review",
+                                json={"action": "approve", "note": "Approved via UI"}, timeout=10)
+                r.raise_for_status()
+                st.success("✅ **Loan Approved Successfully!**")
+                st.balloons()
+            except requests.RequestException as e:
+                st.error(f"Failed to signal approval: {e}")
+
+    with decision_col3:
+        if st.button("❌ **REJECT LOAN**", type="secondary", use_container_width=True):
+            try:
+                r = _api().post(f"{API_URL}/workflow/{workflow_id}/review",
+                                json={"action": "reject", "note": "Rejected via UI"}, timeout=10)
+                r.raise_for_status()
+                st.error("❌ **Loan Rejected**")
+            except requests.RequestException as e:
+                st.error(f"Failed to signal rejection: {e}")
+
+
+@st.fragment(run_every=0.5)
+def _await_workflows_refresh() -> None:
+    """Poll the background /workflows fetch; rerun the app once it has finished."""
+    future = st.session_state["wf_future"]
+    if not future.done():
+        st.caption("Loading workflows...")
+        return
+
+    del st.session_state["wf_future"]
+    try:
+        workflows_data = future.result()
+        st.session_state["workflows_data"] = workflows_data
+        st.session_state["wf_refresh_status"] = ("success", f"Loaded {len(workflows_data.get('workflows', []))} workflows")
+    except requests.RequestException as e:
+        st.session_state["wf_refresh_status"] = ("error", f"Failed to load workflows: {e}")
+    st.rerun()
+
+
+@st.fragment
+def render_workflows_table(workflows: List[Dict[str, Any]]) -> None:
+    """Workflows table and detail view; picking a workflow reruns only this fragment."""
+    # Workflows table
+    st.subheader("📋 Workflows Details")
+
+    # Build the table column-wise; st.dataframe ships a DataFrame to the browser via Arrow
+    df = pd.DataFrame(workflows)
+    loan_amount = pd.to_numeric(df["loan_amount"], errors="coerce")
+    start_time = df["start_time"].fillna("").astype(str).str.slice(0, 19).str.replace("T", " ", regex=False)
+    display_data = pd.DataFrame({
+        "Workflow ID": df["workflow_id"].str.slice(0, 20) + "...",
+        "Applicant": df["applicant_name"].fillna("Unknown"),
+        "Applicant ID": df["applicant_id"].fillna("Unknown"),
+        "Loan Amount": loan_amount.where(loan_amount > 0).map("${:,.2f}".format, na_action="ignore").fillna("N/A"),
+        "Status": df["status"].fillna("Unknown").str.replace("WORKFLOW_EXECUTION_STATUS_", "", regex=False),
+        "Human Decision": df["human_decision"].fillna("Pending").replace("", "Pending"),
+        "Started": start_time.replace("", "N/A"),
+    })
+
+    # Display the table with custom styling
+    st.dataframe(
+        display_data,
+        use_container_width=True,
+        height=400,  # Make it scrollable
+        column_config={
+            "Workflow ID": st.column_config.TextColumn("Workflow ID", width="small"),
+            "Applicant": st.column_config.TextColumn("Applicant", width="small"),
+            "Applicant ID": st.column_config.TextColumn("ID", width="small"),
+            "Loan Amount": st.column_config.TextColumn("Amount", width="small"),
+            "Status": st.column_config.TextColumn("Status", width="small"),
+            "Human Decision": st.column_config.TextColumn("Decision", width="small"),
+            "Started": st.column_config.TextColumn("Started", width="medium")
+        }
+    )
+
+    # Workflow details expander
+    st.markdown("---")
+    st.subheader("🔍 Workflow Details")
+
+    # Select a workflow to view details; index rows by ID for the lookup below
+    workflows_by_id = {w["workflow_id"]: w for w in workflows}
+    selected_workflow_id = st.selectbox(
+        "Select a workflow to view detailed information:",
+        [""] + list(workflows_by_id),
+        format_func=lambda x: x[:30] + "..." if len(x) > 30 else x if x else "Select a workflow..."
+    )
+
+    if selected_workflow_id:
+        selected_workflow = workflows_by_id.get(selected_workflow_id)
+
+        if selected_workflow:
+            # Create tabs for different details
+            detail_tabs = st.tabs(["📋 Application", "🤖 AI Analysis", "👤 Human Review", "⚙️ Technical"])
+
+            with detail_tabs[0]:
+                st.markdown("#### Loan Application Details")
+                summary = selected_workflow.get("summary", {})
+                application = summary.get("application", {}) if summary else {}
+
+                app_col1, app_col2 = st.columns(2)
+                with app_col1:
+                    st.text(f"Name: {application.get('name', 'N/A')}")
+                    st.text(f"Applicant ID: {application.get('applicant_id', 'N/A')}")
+                    st.text(f"Loan Amount: ${application.get('amount', 0):,.2f}")
+
+                with app_col2:
+                    st.text(f"Monthly Income: ${application.get('income', 0):,.2f}")
+                    st.text(f"Monthly Expenses: ${application.get('expenses', 0):,.2f}")
+                    net_income = (application.get('income', 0) or 0) - (application.get('expenses', 0) or 0)
+                    st.text(f"Net Income: ${net_income:,.2f}")
+
+            with detail_tabs[1]:
+                st.markdown("#### AI Analysis Results")
+
+                # Get AI recommendation and summary from the proper location
+                summary = selected_workflow.get("summary", {})
+                suggested_decision = summary.get("suggested_decision", {}) if summary else {}
+
+                # Show additional suggested decision details if available
+                if suggested_decision:
+                    st.markdown("**Additional AI Analysis:**")
+                    for key, value in suggested_decision.items():
+                        if value:
+                            st.text(f"• {_pretty(key)}: {value}")
+
+                # Detailed assessments if available
+                if summary and summary.get("assessments"):
+                    st.markdown("---")
+                    st.markdown("**Detailed Assessments:**")
+                    assessments = summary["assessments"]
+
+                    for assessment_type, assessment_data in assessments.items():
+                        if assessment_data:
+                            st.markdown(f"**{_pretty(assessment_type)}:**")
+                            if isinstance(assessment_data, dict):
+                                for key, value in assessment_data.items():
+                                    st.text(f"  • {_pretty(key)}: {value}")
+                            else:
+                                st.text(f"  • {assessment_data}")
+
+            with detail_tabs[2]:
+                st.markdown("#### Human Review")
+
+                human_decision = selected_workflow.get("human_decision")
+                if human_decision:
+                    st.markdown(f"**Decision:** {human_decision}")
+
+                    final_result = selected_workflow.get("final_result", {})
+                    if final_result and final_result.get("human_decision"):
+                        human_review = final_result["human_decision"]
+                        if human_review.get("note"):
+                            st.markdown(f"**Note:** {human_review['note']}")
+                else:
+                    st.info("No human decision recorded yet")
+
+                    # Quick review buttons
+                    if selected_workflow.get("status") in ["RUNNING", "WORKFLOW_EXECUTION_STATUS_RUNNING"]:
+                        st.markdown("**Quick Review:**")
+                        review_col1, review_col2 = st.columns(2)
+
+                        with review_col1:
+                            if st.button(f"✅ Approve {selected_workflow_id[:8]}...", key=f"approve_{selected_workflow_id}"):
+                                try:
+                                    r = _api().post(f"{API_URL}/workflow/{selected_workflow_id}/review",
+                                                    json={"action": "approve", "note": "Approved from workflows tab"}, timeout=10)
+                                    r.raise_for_status()
+                                    # The cached list still shows this workflow as undecided
+                                    fetch_workflows.clear()
+                                    st.success("Loan approved!")
+                                    st.rerun()
+                                except requests.RequestException as e:
+                                    st.error(f"Failed to approve: {e}")
+
+                        with review_col2:
+                            if st.button(f"❌ Reject {selected_workflow_id[:8]}...", key=f"reject_{selected_workflow_id}"):
+                                try:
+                                    r = _api().post(f"{API_URL}/workflow/{selected_workflow_id}/review",
+                                                    json={"action": "reject", "note": "Rejected from workflows tab"}, timeout=10)
+                                    r.raise_for_status()
+                                    fetch_workflows.clear()
+                                    st.success("Loan rejected!")
+                                    st.rerun()
+                                except requests.RequestException as e:
+                                    st.error(f"Failed to reject: {e}")
+
+            with detail_tabs[3]:
+                st.markdown("#### Technical Information")
+
+                tech_col1, tech_col2 = st.columns(2)
+
+                with tech_col1:
+                    st.text(f"Workflow ID: {selected_workflow.get('workflow_id', 'N/A')}")
+                    st.text(f"Run ID: {selected_workflow.get('run_id', 'N/A')}")
+                    st.text(f"Status: {selected_workflow.get('status', 'N/A')}")
+
+                with tech_col2:
+                    st.text(f"Start Time: {selected_workflow.get('start_time', 'N/A')}")
+                    st.text(f"Close Time: {selected_workflow.get('close_time', 'N/A')}")
+
+                # Raw data expander
+                with st.expander("Raw Workflow Data"):
+                    st.json(selected_workflow)
 
-try:
-    API_URL = st.secrets.get("api_url", "http://localhost:8000")
-except:
-    API_URL = "http://localhost:8000"
 
 st.set_page_config(
     page_title="Intelligent Loan Underwriter",
@@ -34,39 +411,49 @@ with tab[0]:
             "expenses": expenses,
         }
         try:
-            r = requests.post(f"{API_URL}/submit", json=payload, timeout=10)
+            r = _api().post(f"{API_URL}/submit", json=payload, timeout=10)
             r.raise_for_status()
             data = r.json()
             st.success("Workflow started")
             st.json(data)
-        except Exception as e:
+        except requests.RequestException as e:
             st.error(f"Failed to start workflow: {e}")
 
 
 with tab[1]:
     st.header("Human review")
-    review_workflow_id = st.text_input("Workflow ID to review", "")
+    # A form only reruns the script on submit, not on every keystroke in the ID
+    with st.form("review_lookup"):
+        workflow_id_input = st.text_input("Workflow ID to review", "")
+        fetch_clicked = st.form_submit_button("Fetch Loan Details")
 
     summary_data = None
-    if st.button("Fetch Loan Details") and review_workflow_id:
+    if fetch_clicked and workflow_id_input:
+        # Explicit refresh: drop the cached copy so the latest summary is fetched
+        fetch_summary.clear()
+        st.session_state["last_review_wf"] = workflow_id_input
+    review_workflow_id = st.session_state.get("last_review_wf", "")
+
+    if review_workflow_id:
         try:
-            r = requests.get(f"{API_URL}/workflow/{review_workflow_id}/summary", timeout=10)
-            r.raise_for_status()
-            summary_data = r.json()
-            st.session_state[f"summary_{review_workflow_id}"] = summary_data
-        except Exception as e:
+            summary_data = fetch_summary(review_workflow_id)
+        except requests.RequestException as e:
             st.error(f"Failed to fetch summary: {e}")
 
-    # Check if we have cached summary data
-    if f"summary_{review_workflow_id}" in st.session_state:
-        summary_data = st.session_state[f"summary_{review_workflow_id}"]
+    # The summary only exists once the decision is ready; until then show the stage
+    pending = bool(summary_data) and summary_data.get("summary", {}).get("status") == "pending"
 
-    if summary_data and review_workflow_id:
+    if summary_data and review_workflow_id and not pending:
         summary = summary_data.get("summary", {})
         application = summary.get("application", {})
         assessments = summary.get("assessments", {})
         suggested_decision = summary.get("suggested_decision", {})
 
+        # Reviewers can only decide once the hard-reject gate and AI decision have run
+        decided = summary.get("phase", "decided") == "decided"
+        if not decided:
+            st.info(f"⏳ Partial results ({summary['phase'].replace('_', ' ')}): the AI decision is still "
+                    "being prepared. Click 'Fetch Loan Details' to refresh")
 
         # Display AI analysis summary from assessments
         if assessments:
@@ -78,16 +465,16 @@ with tab[1]:
             for idx, (assessment_type, assessment_data) in enumerate(assessments.items()):
                 if assessment_data:
                     with assessment_cols[idx]:
-                        st.markdown(f"### {assessment_type.replace('_', ' ').title()}")
+                        st.markdown(f"### {_pretty(assessment_type)}")
 
                         if isinstance(assessment_data, dict):
                             # Create a clean card-like display
                             for key, value in assessment_data.items():
                                 if key.lower() in ['score', 'rating', 'risk']:
                                     # Highlight important metrics
-                                    st.metric(label=key.replace('_', ' ').title(), value=str(value))
+                                    st.metric(label=_pretty(key), value=str(value))
                                 else:
-                                    st.markdown(f"**{key.replace('_', ' ').title()}:** {value}")
+                                    st.markdown(f"**{_pretty(key)}:** {value}")
                         else:
                             st.markdown(assessment_data)
 
@@ -146,13 +533,7 @@ with tab[1]:
                         st.markdown("**📋 Credit Report**")
                         credit = summary["credit"]
                         if isinstance(credit, dict):
-                            credit_col1, credit_col2 = st.columns(2)
-                            with credit_col1:
-                                for key, value in list(credit.items())[:len(credit.items())//2]:
-                                    st.text(f"{key.replace('_', ' ').title()}: {value}")
-                            with credit_col2:
-                                for key, value in list(credit.items())[len(credit.items())//2:]:
-                                    st.text(f"{key.replace('_', ' ').title()}: {value}")
+                            st.markdown(_dict_to_md_table(credit))
                         else:
                             st.text(credit)
                         st.markdown("---")
@@ -162,8 +543,7 @@ with tab[1]:
                         st.markdown("**🏛️ Bank Account Information**")
                         bank = summary["bank"]
                         if isinstance(bank, dict):
-                            for key, value in bank.items():
-                                st.text(f"{key.replace('_', ' ').title()}: {value}")
+                            st.markdown(_dict_to_md_table(bank))
                         else:
                             st.text(bank)
                         st.markdown("---")
@@ -173,8 +553,7 @@ with tab[1]:
                         st.markdown("**📄 Document Verification**")
                         docs = summary["docs"]
                         if isinstance(docs, dict):
-                            for key, value in docs.items():
-                                st.text(f"{key.replace('_', ' ').title()}: {value}")
+                            st.markdown(_dict_to_md_table(docs))
                         else:
                             st.text(docs)
 
@@ -185,10 +564,9 @@ with tab[1]:
                     if assessments:
                         for assessment_type, assessment_data in assessments.items():
                             if assessment_data:
-                                st.markdown(f"**{assessment_type.replace('_', ' ').title()} Assessment Agent**")
+                                st.markdown(f"**{_pretty(assessment_type)} Assessment Agent**")
                                 if isinstance(assessment_data, dict):
-                                    for key, value in assessment_data.items():
-                                        st.text(f"• {key.replace('_', ' ').title()}: {value}")
+                                    st.markdown(_dict_to_md_table(assessment_data))
                                 else:
                                     st.text(f"• {assessment_data}")
                                 st.markdown("---")
@@ -196,8 +574,7 @@ with tab[1]:
                     # Suggested Decision Details
                     if suggested_decision and isinstance(suggested_decision, dict):
                         st.markdown("**🤖 Supervisor Agent Decisioning**")
-                        for key, value in suggested_decision.items():
-                            st.text(f"• {key.replace('_', ' ').title()}: {value}")
+                        st.markdown(_dict_to_md_table(suggested_decision))
 
                 with data_tabs[2]:
                     st.markdown("#### Technical Processing Information")
@@ -216,34 +593,15 @@ with tab[1]:
                         st.text(f"Last Updated: {summary_data['updated_at']}")
 
         # Decision buttons
-        st.markdown("## 💼 Make Your Decision")
-        st.markdown("*Review all information above and make your final decision:*")
-
-        decision_col1, decision_col2, decision_col3 = st.columns([2, 1, 2])
-
-        with decision_col1:
-            if st.button("✅ **APPROVE LOAN**", type="primary", use_container_width=True):
-                try:
-                    r = requests.post(f"{API_URL}/workflow/{review_workflow_id}/review",
-                                    json={"action": "approve", "note": "Approved via UI"}, timeout=10)
-                    r.raise_for_status()
-                    st.success("✅ **Loan Approved Successfully!**")
-                    st.balloons()
-                except Exception as e:
-                    st.error(f"Failed to signal approval: {e}")
-
-        with decision_col3:
-            if st.button("❌ **REJECT LOAN**", type="secondary", use_container_width=True):
-                try:
-                    r = requests.post(f"{API_URL}/workflow/{review_workflow_id}/review",
-                                    json={"action": "reject", "note": "Rejected via UI"}, timeout=10)
-                    r.raise_for_status()
-                    st.error("❌ **Loan Rejected**")
-                except Exception as e:
-                    st.error(f"Failed to signal rejection: {e}")
+        if decided:
+            render_decision_buttons(review_workflow_id)
 
     elif review_workflow_id:
-        st.info("👆 Click 'Fetch Loan Details' to load the application for review")
+        stage = fetch_progress(review_workflow_id) if pending else None
+        if stage:
+            st.info(f"⏳ Still processing ({stage.replace('_', ' ')}). Click 'Fetch Loan Details' to refresh")
+        else:
+            st.info("👆 Loan details are not available yet. Click 'Fetch Loan Details' to retry")
 
 
 with tab[2]:
@@ -254,16 +612,20 @@ with tab[2]:
     col1, col2 = st.columns([1, 4])
 
     with col1:
-        if st.button("🔄 Refresh Workflows", type="secondary"):
-            with st.spinner("Loading workflows..."):
-                try:
-                    r = requests.get(f"{API_URL}/workflows", timeout=30)
-                    r.raise_for_status()
-                    workflows_data = r.json()
-                    st.session_state["workflows_data"] = workflows_data
-                    st.success(f"Loaded {len(workflows_data.get('workflows', []))} workflows")
-                except Exception as e:
-                    st.error(f"Failed to load workflows: {e}")
+        if st.button("🔄 Refresh Workflows", type="secondary") and "wf_future" not in st.session_state:
+            # Fetch off the script thread; the rest of the UI stays usable while it loads
+            st.session_state["wf_future"] = _submit_in_background(fetch_workflows)
+
+        if "wf_future" in st.session_state:
+            _await_workflows_refresh()
+
+        status = st.session_state.pop("wf_refresh_status", None)
+        if status is not None:
+            level, message = status
+            if level == "success":
+                st.success(message)
+            else:
+                st.error(message)
 
     with col2:
         st.info("Click 'Refresh Workflows' to load the latest loan applications and their status")
@@ -277,12 +639,19 @@ with tab[2]:
 
         # Summary metrics
         st.subheader("📊 Summary")
+        if workflows_data.get("truncated"):
+            st.caption(f"Showing the latest {len(workflows)} workflows; more exist and are not "
+                       "included in these metrics or the table below.")
+
+        # Tally statuses and decisions once instead of filtering the rows per metric
+        status_counts = Counter(w["status"].replace("WORKFLOW_EXECUTION_STATUS_", "") for w in workflows)
+        decision_counts = Counter(w.get("human_decision") for w in workflows)
 
         total_workflows = len(workflows)
-        running_workflows = len([w for w in workflows if w["status"] in ["RUNNING", "WORKFLOW_EXECUTION_STATUS_RUNNING"]])
-        completed_workflows = len([w for w in workflows if w["status"] in ["COMPLETED", "WORKFLOW_EXECUTION_STATUS_COMPLETED"]])
-        approved_loans = len([w for w in workflows if w.get("human_decision") == "approve"])
-        rejected_loans = len([w for w in workflows if w.get("human_decision") == "reject"])
+        running_workflows = status_counts["RUNNING"]
+        completed_workflows = status_counts["COMPLETED"]
+        approved_loans = decision_counts["approve"]
+        rejected_loans = decision_counts["reject"]
 
         metric_col1, metric_col2, metric_col3, metric_col4, metric_col5 = st.columns(5)
 
@@ -299,174 +668,7 @@ with tab[2]:
 
         st.markdown("---")
 
-        # Workflows table
-        st.subheader("📋 Workflows Details")
-
-        # Create a scrollable table using st.dataframe
-        display_data = []
-
-        for workflow in workflows:
-            # Format the status with color indicators
-            status = workflow.get("status", "Unknown").replace("WORKFLOW_EXECUTION_STATUS_", "")
-
-            # Format loan amount
-            loan_amount = workflow.get("loan_amount", 0)
-            formatted_amount = f"${loan_amount:,.2f}" if loan_amount else "N/A"
-
-            # Format timestamps
-            start_time = workflow.get("start_time")
-            formatted_start_time = start_time[:19].replace("T", " ") if start_time else "N/A"
-
-            display_data.append({
-                "Workflow ID": workflow.get("workflow_id", "N/A")[:20] + "...",
-                "Applicant": workflow.get("applicant_name", "Unknown"),
-                "Applicant ID": workflow.get("applicant_id", "Unknown"),
-                "Loan Amount": formatted_amount,
-                "Status": status,
-                "Human Decision": workflow.get("human_decision", "Pending") or "Pending",
-                "Started": formatted_start_time
-            })
-
-        # Display the table with custom styling
-        st.dataframe(
-            display_data,
-            use_container_width=True,
-            height=400,  # Make it scrollable
-            column_config={
-                "Workflow ID": st.column_config.TextColumn("Workflow ID", width="small"),
-                "Applicant": st.column_config.TextColumn("Applicant", width="small"),
-                "Applicant ID": st.column_config.TextColumn("ID", width="small"),
-                "Loan Amount": st.column_config.TextColumn("Amount", width="small"),
-                "Status": st.column_config.TextColumn("Status", width="small"),
-                "Human Decision": st.column_config.TextColumn("Decision", width="small"),
-                "Started": st.column_config.TextColumn("Started", width="medium")
-            }
-        )
-
-        # Workflow details expander
-        st.markdown("---")
-        st.subheader("🔍 Workflow Details")
-
-        # Select a workflow to view details
-        workflow_ids = [w["workflow_id"] for w in workflows]
-        selected_workflow_id = st.selectbox(
-            "Select a workflow to view detailed information:",
-            [""] + workflow_ids,
-            format_func=lambda x: x[:30] + "..." if len(x) > 30 else x if x else "Select a workflow..."
-        )
-
-        if selected_workflow_id:
-            selected_workflow = next((w for w in workflows if w["workflow_id"] == selected_workflow_id), None)
-
-            if selected_workflow:
-                # Create tabs for different details
-                detail_tabs = st.tabs(["📋 Application", "🤖 AI Analysis", "👤 Human Review", "⚙️ Technical"])
-
-                with detail_tabs[0]:
-                    st.markdown("#### Loan Application Details")
-                    summary = selected_workflow.get("summary", {})
-                    application = summary.get("application", {}) if summary else {}
-
-                    app_col1, app_col2 = st.columns(2)
-                    with app_col1:
-                        st.text(f"Name: {application.get('name', 'N/A')}")
-                        st.text(f"Applicant ID: {application.get('applicant_id', 'N/A')}")
-                        st.text(f"Loan Amount: ${application.get('amount', 0):,.2f}")
-
-                    with app_col2:
-                        st.text(f"Monthly Income: ${application.get('income', 0):,.2f}")
-                        st.text(f"Monthly Expenses: ${application.get('expenses', 0):,.2f}")
-                        net_income = (application.get('income', 0) or 0) - (application.get('expenses', 0) or 0)
-                        st.text(f"Net Income: ${net_income:,.2f}")
-
-                with detail_tabs[1]:
-                    st.markdown("#### AI Analysis Results")
-
-                    # Get AI recommendation and summary from the proper location
-                    summary = selected_workflow.get("summary", {})
-                    suggested_decision = summary.get("suggested_decision", {}) if summary else {}
-
-                    # Show additional suggested decision details if available
-                    if suggested_decision:
-                        st.markdown("**Additional AI Analysis:**")
-                        for key, value in suggested_decision.items():
-                            if value:
-                                st.text(f"• {key.replace('_', ' ').title()}: {value}")
-
-                    # Detailed assessments if available
-                    if summary and summary.get("assessments"):
-                        st.markdown("---")
-                        st.markdown("**Detailed Assessments:**")
-                        assessments = summary["assessments"]
-
-                        for assessment_type, assessment_data in assessments.items():
-                            if assessment_data:
-                                st.markdown(f"**{assessment_type.replace('_', ' ').title()}:**")
-                                if isinstance(assessment_data, dict):
-                                    for key, value in assessment_data.items():
-                                        st.text(f"  • {key.replace('_', ' ').title()}: {value}")
-                                else:
-                                    st.text(f"  • {assessment_data}")
-
-                with detail_tabs[2]:
-                    st.markdown("#### Human Review")
-
-                    human_decision = selected_workflow.get("human_decision")
-                    if human_decision:
-                        st.markdown(f"**Decision:** {human_decision}")
-
-                        final_result = selected_workflow.get("final_result", {})
-                        if final_result and final_result.get("human_decision"):
-                            human_review = final_result["human_decision"]
-                            if human_review.get("note"):
-                                st.markdown(f"**Note:** {human_review['note']}")
-                    else:
-                        st.info("No human decision recorded yet")
-
-                        # Quick review buttons
-                        if selected_workflow.get("status") in ["RUNNING", "WORKFLOW_EXECUTION_STATUS_RUNNING"]:
-                            st.markdown("**Quick Review:**")
-                            review_col1, review_col2 = st.columns(2)
-
-                            with review_col1:
-                                if st.button(f"✅ Approve {selected_workflow_id[:8]}...", key=f"approve_{selected_workflow_id}"):
-                                    try:
-                                        r = requests.post(f"{API_URL}/workflow/{selected_workflow_id}/review",
-                                                        json={"action": "approve", "note": "Approved from workflows tab"}, timeout=10)
-                                        r.raise_for_status()
-                                        st.success("Loan approved!")
-                                        st.rerun()
-                                    except Exception as e:
-                                        st.error(f"Failed to approve: {e}")
-
-                            with review_col2:
-                                if st.button(f"❌ Reject {selected_workflow_id[:8]}...", key=f"reject_{selected_workflow_id}"):
-                                    try:
-                                        r = requests.post(f"{API_URL}/workflow/{selected_workflow_id}/review",
-                                                        json={"action": "reject", "note": "Rejected from workflows tab"}, timeout=10)
-                                        r.raise_for_status()
-                                        st.success("Loan rejected!")
-                                        st.rerun()
-                                    except Exception as e:
-                                        st.error(f"Failed to reject: {e}")
-
-                with detail_tabs[3]:
-                    st.markdown("#### Technical Information")
-
-                    tech_col1, tech_col2 = st.columns(2)
-
-                    with tech_col1:
-                        st.text(f"Workflow ID: {selected_workflow.get('workflow_id', 'N/A')}")
-                        st.text(f"Run ID: {selected_workflow.get('run_id', 'N/A')}")
-                        st.text(f"Status: {selected_workflow.get('status', 'N/A')}")
-
-                    with tech_col2:
-                        st.text(f"Start Time: {selected_workflow.get('start_time', 'N/A')}")
-                        st.text(f"Close Time: {selected_workflow.get('close_time', 'N/A')}")
-
-                    # Raw data expander
-                    with st.expander("Raw Workflow Data"):
-                        st.json(selected_workflow)
+        render_workflows_table(workflows)
 
     else:
         st.info("No workflows loaded. Click 'Refresh Workflows' to load loan applications.")